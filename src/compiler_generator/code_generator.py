@@ -5,6 +5,7 @@
 """
 
 from typing import Dict, Optional, Any, List, Tuple
+from sys import intern
 from src.compiler_generator.parser_generator import ASTNode
 
 class CodeGenerator:
@@ -50,8 +51,14 @@ class CodeGenerator:
         """发出一条三地址码指令
 
         生成的指令格式：result = arg1 op arg2
+
+        说明:
+            最常见的二元运算形式（result、op、arg2 均非空且首尾无空白）直接套用完整格式串，
+            省去 strip() 的一次扫描与拷贝；其余形式仍格式化后 strip()，输出与原先一致。
         """
-        if result:
+        if result and op and arg2 and not result[0].isspace() and not arg2[-1].isspace():
+            instruction = f"{result} = {arg1} {op} {arg2}"
+        elif result:
             instruction = f"{result} = {arg1} {op} {arg2}".strip()
         else:
             instruction = f"{op} {arg1} {arg2}".strip()
@@ -60,7 +67,7 @@ class CodeGenerator:
 
     def add_symbol(self, name: str, var_type: str = "int", value: Any = None) -> None:
         """将一个符号（变量）添加到符号表"""
-        self.symbol_table[name] = {
+        self.symbol_table[intern(name)] = {
             'type': var_type,
             'value': value,
             'defined': False
@@ -68,7 +75,7 @@ class CodeGenerator:
 
     def lookup_symbol(self, name: str) -> Optional[Dict[str, Any]]:
         """查找符号表中的一个符号"""
-        return self.symbol_table.get(name)
+        return self.symbol_table.get(intern(name))
 
     def generate_from_ast(self, node: ASTNode) -> str:
         """从AST生成中间代码的主方法"""
@@ -130,7 +137,9 @@ class CodeGenerator:
                 expr_value = self._traverse_ast(node.children[2])
                 if var_name and expr_value:
                     self.code_list.append(f"{var_name} = {expr_value}")
-                    self.add_symbol(var_name)
+                    # 重复赋值时变量已在符号表中，不再重建表项
+                    if var_name not in self.symbol_table:
+                        self.add_symbol(var_name)
             # 识别打印语句 (第一个孩子是 PRINT) - 严格三地址码
             elif first_child.name == "'PRINT'":
                 expr_value = self._traverse_ast(node.children[2])
@@ -174,6 +183,15 @@ class CodeGenerator:
         """获取生成的中间代码"""
         return '\n'.join(self.code_list)
 
+    def write_code(self, out) -> None:
+        """将生成的中间代码逐行写入文件对象（内容与 get_code() 相同，不拼接完整字符串）"""
+        write = out.write
+        sep = ''
+        for line in self.code_list:
+            write(sep)
+            write(line)
+            sep = '\n'
+
     def print_symbol_table(self) -> str:
         """打印符号表的内容"""
         result = "=== Symbol Table ===\n"
@@ -11,8 +11,12 @@ Algorithm flow:
 4. DFA longest match scanning
 """
 
-from typing import List, Tuple, Dict, Set, Optional
+import re
+from array import array
+from typing import List, Tuple, Dict, Set, Optional, Callable, Sequence
 from dataclasses import dataclass
+from itertools import count
+from sys import intern, byteorder
 
 
 # ============================================================================
@@ -21,6 +25,21 @@ from dataclasses import dataclass
 
 EPSILON = None  # Marker for ε-transitions
 
+# Above this many distinct successors a generated scanner state dispatches
+# through a dict instead of an if/elif chain
+_MAX_INLINE_BRANCHES = 4
+
+# Runs of whitespace and newline-terminated // comments, skipped in one C-level step.
+# A trailing comment without a newline is left for the scanner, which stops there.
+_SKIP_RE = re.compile(r'\s*(?://[^\n]*\n\s*)*')
+
+# Native-order UTF-32 (no BOM), so the encoded buffer can be cast to 'I' items
+_UTF32 = 'utf-32-le' if byteorder == 'little' else 'utf-32-be'
+
+# Rule list -> built automaton and tables, so identical specs are compiled once
+# per process (the built objects are never mutated after build())
+_BUILD_CACHE: Dict[Tuple[Tuple[str, str], ...], tuple] = {}
+
 
 # ============================================================================
 # Token Data Structure
@@ -36,6 +55,8 @@ class Token:
         line: Line number in source code
         column: Column number in source code
     """
+    __slots__ = ('type', 'value', 'line', 'column')
+
     type: str
     value: str
     line: int
@@ -51,13 +72,17 @@ class Token:
 # ============================================================================
 
 class NFAState:
-    """NFA state: records transitions and whether it's an accepting state"""
-    _id_counter = 0
+    """NFA state: records transitions and whether it's an accepting state
 
-    def __init__(self):
-        self.id = NFAState._id_counter
-        NFAState._id_counter += 1
-        # transitions: symbol -> set(NFAState)
+    The id is handed in by the caller (see ``thompson``) instead of being drawn
+    from a class-level counter, so ids are deterministic per build.
+    """
+    __slots__ = ('id', 'trans', 'is_accept', 'token_type', 'priority')
+
+    def __init__(self, sid: int):
+        self.id = sid
+        # transitions: symbol -> set(NFAState) while building,
+        # symbol -> sorted tuple of state ids once frozen
         self.trans: Dict[Optional[str], Set['NFAState']] = {}
         self.is_accept = False
         self.token_type: Optional[str] = None   # Which token this accepts
@@ -69,9 +94,19 @@ class NFAState:
             self.trans[symbol] = set()
         self.trans[symbol].add(state)
 
+    def freeze(self):
+        """Replace transition target sets with sorted tuples of state ids
+
+        Called once construction is complete; subset construction only ever
+        iterates the targets, and ints index straight into the flat state list.
+        """
+        self.trans = {sym: tuple(sorted(s.id for s in dsts)) for sym, dsts in self.trans.items()}
+
 
 class NFAFragment:
     """Fragment used in Thompson's construction: start state + set of accepting states"""
+    __slots__ = ('start', 'accepts')
+
     def __init__(self, start: NFAState, accepts: Set[NFAState]):
         self.start = start
         self.accepts = accepts  # set of NFAState
@@ -82,12 +117,11 @@ class NFAFragment:
 # ============================================================================
 
 class DFAState:
-    """DFA state: composed of a set of NFA states"""
-    _id_counter = 0
+    """DFA state: composed of a set of NFA states (by NFA state id)"""
+    __slots__ = ('id', 'nfa_states', 'trans', 'is_accept', 'token_type', 'priority')
 
-    def __init__(self, nfa_states: Set[NFAState]):
-        self.id = DFAState._id_counter
-        DFAState._id_counter += 1
+    def __init__(self, sid: int, nfa_states: Set[int]):
+        self.id = sid
         self.nfa_states = frozenset(nfa_states)
         self.trans: Dict[str, 'DFAState'] = {}      # symbol -> DFAState
         self.is_accept = False
@@ -181,9 +215,9 @@ class RegexParser:
                 self.get()
                 base = ('STAR', base)
             elif ch == '+':
-                # a+ converts to aa*
+                # a+ gets its own node so Thompson builds `a` only once
                 self.get()
-                base = ('CONCAT', [base, ('STAR', base)])
+                base = ('PLUS', base)
             elif ch == '?':
                 # a? converts to a|epsilon
                 self.get()
@@ -297,17 +331,27 @@ class RegexParser:
 # Thompson's Construction: AST → NFA
 # ============================================================================
 
-def thompson(ast) -> NFAFragment:
-    """Thompson's construction: AST -> NFAFragment"""
+def thompson(ast, next_id: Optional[Callable[[], int]] = None) -> NFAFragment:
+    """Thompson's construction: AST -> NFAFragment
+
+    Args:
+        ast: Regex AST produced by RegexParser
+        next_id: State id allocator (e.g. ``itertools.count().__next__``);
+                 pass the same allocator for every rule of one lexer so that
+                 ids stay unique across the combined NFA
+    """
+    if next_id is None:
+        next_id = count().__next__
+
     def build(node):
         nodetype = node[0]
         if nodetype == 'LIT':
-            start = NFAState()
-            end = NFAState()
+            start = NFAState(next_id())
+            end = NFAState(next_id())
             start.add_trans(node[1], end)
             return NFAFragment(start, {end})
         elif nodetype == 'EPS':
-            start = NFAState()
+            start = NFAState(next_id())
             return NFAFragment(start, {start})
         elif nodetype == 'CONCAT':
             frags = [build(n) for n in node[1]]
@@ -318,21 +362,37 @@ def thompson(ast) -> NFAFragment:
                 cur = NFAFragment(cur.start, nxt.accepts)
             return cur
         elif nodetype == 'ALT':
-            start = NFAState()
+            start = NFAState(next_id())
             accepts = set()
+            # Single-character alternatives (character classes) would each build an
+            # identical `s -c-> e` fragment; share one end state reached directly
+            # from start, so [a-zA-Z_] is 2 states instead of 1 + 2 * 53
+            shared_end = None
             for sub in node[1]:
+                if sub[0] == 'LIT':
+                    if shared_end is None:
+                        shared_end = NFAState(next_id())
+                        accepts.add(shared_end)
+                    start.add_trans(sub[1], shared_end)
+                    continue
                 frag = build(sub)
                 start.add_trans(EPSILON, frag.start)
                 accepts.update(frag.accepts)
             return NFAFragment(start, accepts)
         elif nodetype == 'STAR':
             frag = build(node[1])
-            start = NFAState()
+            start = NFAState(next_id())
             start.add_trans(EPSILON, frag.start)
             for a in frag.accepts:
                 a.add_trans(EPSILON, frag.start)
                 a.add_trans(EPSILON, start)
             return NFAFragment(start, {start})
+        elif nodetype == 'PLUS':
+            # a+ : build `a` once and loop its accepts back to its start
+            frag = build(node[1])
+            for a in frag.accepts:
+                a.add_trans(EPSILON, frag.start)
+            return NFAFragment(frag.start, frag.accepts)
         else:
             raise ValueError(f"Unknown AST node: {node}")
     return build(ast)
@@ -342,25 +402,83 @@ def thompson(ast) -> NFAFragment:
 # Subset Construction: NFA → DFA
 # ============================================================================
 
-def epsilon_closure(states: Set[NFAState]) -> Set[NFAState]:
-    """Compute ε-closure"""
+def freeze_nfa(start_state: NFAState) -> List[Optional[NFAState]]:
+    """Collect all NFA states reachable from start_state and freeze them
+
+    Returns:
+        Flat list of NFA states indexed by state id
+    """
+    found: Dict[int, NFAState] = {}
+    stack = [start_state]
+    while stack:
+        s = stack.pop()
+        if s.id in found:
+            continue
+        found[s.id] = s
+        for targets in s.trans.values():
+            for t in targets:
+                if t.id not in found:
+                    stack.append(t)
+
+    states: List[Optional[NFAState]] = [None] * (max(found) + 1)
+    for sid, s in found.items():
+        s.freeze()
+        states[sid] = s
+    return states
+
+
+def epsilon_closure(states: Set[int], nfa: List[NFAState]) -> Set[int]:
+    """Compute ε-closure over frozen NFA state ids"""
     stack = list(states)
     closure = set(states)
     while stack:
         s = stack.pop()
-        for nxt in s.trans.get(EPSILON, []):
+        for nxt in nfa[s].trans.get(EPSILON, ()):
             if nxt not in closure:
                 closure.add(nxt)
                 stack.append(nxt)
     return closure
 
 
-def move(states: Set[NFAState], symbol: str) -> Set[NFAState]:
-    """NFA move operation"""
+def epsilon_closure_masks(nfa: List[Optional[NFAState]]) -> List[int]:
+    """ε-closure of every NFA state as an int bitmask (bit i <-> state i)
+
+    One iterative DFS per state over a shared stack; visited marks live in a
+    bytearray indexed by state id and are reset from the list of states touched,
+    so no per-state set is allocated.
+    """
+    size = len(nfa)
+    eps: List[Tuple[int, ...]] = [s.trans.get(EPSILON, ()) if s is not None else () for s in nfa]
+    masks = [0] * size
+    visited = bytearray(size)
+    stack: List[int] = []
+    for s in nfa:
+        if s is None:
+            continue
+        sid = s.id
+        visited[sid] = 1
+        seen = [sid]
+        stack.append(sid)
+        mask = 0
+        while stack:
+            q = stack.pop()
+            mask |= 1 << q
+            for t in eps[q]:
+                if not visited[t]:
+                    visited[t] = 1
+                    seen.append(t)
+                    stack.append(t)
+        for q in seen:
+            visited[q] = 0
+        masks[sid] = mask
+    return masks
+
+
+def move(states: Set[int], symbol: str, nfa: List[NFAState]) -> Set[int]:
+    """NFA move operation over frozen NFA state ids"""
     res = set()
     for s in states:
-        for nxt in s.trans.get(symbol, []):
-            res.add(nxt)
+        res.update(nfa[s].trans.get(symbol, ()))
     return res
 
 
@@ -376,41 +494,61 @@ def nfa_to_dfa(start_state: NFAState) -> Tuple[DFAState, List[DFAState], Set[str
     Optimizations:
         - Use set operations to optimize epsilon_closure and move
         - Reduce redundant computations
+        - NFA transitions are frozen to id tuples, subsets are int bitmasks
+        - ε-closure of every NFA state is computed once up front as a mask; the
+          closure of a move set is the OR of its members' closure masks
+        - Outgoing edges of a DFA state are bucketed by symbol in a single pass
+          (OR of per-state target masks) instead of calling move() per symbol
+        - Subset states are interned by their (smaller) move set as well as by
+          their closure, so repeated targets are resolved with one dict probe
     """
-    # Collect all NFA states & alphabet (optimization: collect in one pass)
-    all_states = set()
+    # Freeze the NFA into a flat id-indexed list & collect the alphabet
+    nfa = freeze_nfa(start_state)
     alphabet = set()
-    stack = [start_state]
-    visited = set()
-    
-    while stack:
-        s = stack.pop()
-        if s in visited:
+    for s in nfa:
+        if s is None:
             continue
-        visited.add(s)
-        all_states.add(s)
-        
-        for sym, targets in s.trans.items():
+        for sym in s.trans:
             if sym is not EPSILON:
                 alphabet.add(sym)
-            for t in targets:
-                if t not in visited:
-                    stack.append(t)
 
-    start_closure = epsilon_closure({start_state})
-    dfa_states_map: Dict[frozenset, DFAState] = {}
-    dfa_list: List[DFAState] = []
+    # Subsets of NFA states are int bitmasks (bit i <-> NFA state i), so unions
+    # are single C-level ORs over machine words and masks are cheap dict keys
+    closure_masks = epsilon_closure_masks(nfa)
+    sym_masks: List[Dict[str, int]] = [{} for _ in nfa]
+    for s in nfa:
+        if s is None:
+            continue
+        edges = sym_masks[s.id]
+        for sym, targets in s.trans.items():
+            if sym is not EPSILON:
+                mask = 0
+                for t in targets:
+                    mask |= 1 << t
+                edges[sym] = mask
 
-    def get_dfa_state(nfa_set: Set[NFAState]) -> DFAState:
-        """Get or create DFA state (optimization: cache frozenset)"""
-        key = frozenset(nfa_set)
-        if key in dfa_states_map:
-            return dfa_states_map[key]
-        ds = DFAState(key)
+    dfa_states_map: Dict[int, DFAState] = {}
+    kernel_map: Dict[int, DFAState] = {}   # move set -> DFA state
+    dfa_list: List[DFAState] = []
+    next_id = count().__next__
+
+    def get_dfa_state(subset: int) -> DFAState:
+        """Get or create the DFA state for a subset bitmask"""
+        ds = dfa_states_map.get(subset)
+        if ds is not None:
+            return ds
+        members = []
+        rest = subset
+        while rest:
+            low = rest & -rest
+            members.append(low.bit_length() - 1)
+            rest ^= low
+        ds = DFAState(next_id(), members)
         # Determine if it's an accepting state and corresponding token (by priority)
         best_priority: Optional[int] = None
         best_token: Optional[str] = None
-        for n in key:
+        for sid in members:
+            n = nfa[sid]
             if n.is_accept:
                 if best_priority is None or (n.priority is not None and n.priority < best_priority):
                     best_priority = n.priority
@@ -419,11 +557,11 @@ def nfa_to_dfa(start_state: NFAState) -> Tuple[DFAState, List[DFAState], Set[str
             ds.is_accept = True
             ds.priority = best_priority
             ds.token_type = best_token
-        dfa_states_map[key] = ds
+        dfa_states_map[subset] = ds
         dfa_list.append(ds)
         return ds
 
-    start_dfa = get_dfa_state(start_closure)
+    start_dfa = get_dfa_state(closure_masks[start_state.id])
     worklist = [start_dfa]
     processed = {start_dfa}  # Optimization: avoid duplicate processing
     
@@ -431,12 +569,27 @@ def nfa_to_dfa(start_state: NFAState) -> Tuple[DFAState, List[DFAState], Set[str
         d = worklist.pop()
         processed.add(d)
         
-        # Optimization: only process characters that actually appear
-        for sym in alphabet:
-            target_nfa = epsilon_closure(move(d.nfa_states, sym))
-            if not target_nfa:
-                continue
-            tgt_dfa = get_dfa_state(target_nfa)
+        # Optimization: OR together the per-symbol target masks of all member
+        # NFA states in one pass, so only symbols that actually leave d are visited
+        sym_to_kernel: Dict[str, int] = {}
+        get = sym_to_kernel.get
+        for sid in d.nfa_states:
+            for sym, mask in sym_masks[sid].items():
+                sym_to_kernel[sym] = get(sym, 0) | mask
+
+        for sym, kernel in sym_to_kernel.items():
+            # Intern by move set: equal move sets have equal closures, so a hit
+            # skips the closure union entirely
+            tgt_dfa = kernel_map.get(kernel)
+            if tgt_dfa is None:
+                subset = 0
+                rest = kernel
+                while rest:
+                    low = rest & -rest
+                    subset |= closure_masks[low.bit_length() - 1]
+                    rest ^= low
+                tgt_dfa = get_dfa_state(subset)
+                kernel_map[kernel] = tgt_dfa
             d.trans[sym] = tgt_dfa
             if tgt_dfa not in processed:
                 worklist.append(tgt_dfa)
@@ -445,6 +598,447 @@ def nfa_to_dfa(start_state: NFAState) -> Tuple[DFAState, List[DFAState], Set[str
     return start_dfa, dfa_list, alphabet
 
 
+def minimize_dfa(start_dfa: DFAState, dfa_list: List[DFAState],
+                 alphabet: Set[str]) -> Tuple[DFAState, List[DFAState]]:
+    """Hopcroft DFA minimization
+
+    Args:
+        start_dfa: DFA start state
+        dfa_list: All DFA states (ids 0..len-1)
+        alphabet: Alphabet
+
+    Returns:
+        (start_dfa, dfa_list) of the minimized DFA, ids renumbered from 0 in
+        breadth-first order from the start state
+
+    Note:
+        States are initially partitioned by accepted token type (non-accepting
+        states form one block), then refined by splitter (block, symbol) pairs.
+        Only symbols entering the splitter and only blocks its pre-image touches
+        are visited; the worklist holds block indices with O(1) membership.
+        Missing transitions go to an implicit dead state; states equivalent to it
+        can never reach an accepting state and are dropped, so the scanner gives
+        up on them immediately.
+    """
+    n = len(dfa_list)
+    dead = n
+
+    # Inverse transitions: inverse[target_id][sym] -> source ids
+    inverse: List[Dict[str, List[int]]] = [{} for _ in range(n + 1)]
+    for d in dfa_list:
+        for sym in alphabet:
+            target = d.trans.get(sym)
+            inverse[target.id if target is not None else dead].setdefault(sym, []).append(d.id)
+    dead_row = inverse[dead]
+    for sym in alphabet:
+        dead_row.setdefault(sym, []).append(dead)
+
+    # Initial partition: one block per token type, plus non-accepting (with dead)
+    initial: Dict[Optional[str], Set[int]] = {None: {dead}}
+    for d in dfa_list:
+        initial.setdefault(d.token_type if d.is_accept else None, set()).add(d.id)
+    partition: List[Set[int]] = list(initial.values())
+    block_of: List[int] = [0] * (n + 1)
+    for index, block in enumerate(partition):
+        for q in block:
+            block_of[q] = index
+    worklist: List[int] = list(range(len(partition)))
+    in_worklist: Set[int] = set(worklist)
+
+    while worklist:
+        splitter = worklist.pop()
+        in_worklist.discard(splitter)
+        # Pre-images of the splitter for every symbol that actually enters it
+        pre_images: Dict[str, Set[int]] = {}
+        for q in partition[splitter]:
+            for sym, sources in inverse[q].items():
+                pre = pre_images.get(sym)
+                if pre is None:
+                    pre_images[sym] = set(sources)
+                else:
+                    pre.update(sources)
+
+        for pre_image in pre_images.values():
+            # Only blocks that the pre-image touches can split
+            touched: Dict[int, List[int]] = {}
+            for p in pre_image:
+                touched.setdefault(block_of[p], []).append(p)
+            for index, inside in touched.items():
+                block = partition[index]
+                if len(inside) == len(block):
+                    continue
+                # Split: `inside` moves to a new block, the rest stays at index
+                new_index = len(partition)
+                block.difference_update(inside)
+                partition.append(set(inside))
+                for p in inside:
+                    block_of[p] = new_index
+                if index in in_worklist or len(inside) <= len(block):
+                    worklist.append(new_index)
+                    in_worklist.add(new_index)
+                else:
+                    worklist.append(index)
+                    in_worklist.add(index)
+
+    dead_block = block_of[dead]
+
+    # Rebuild one DFAState per live block, numbered breadth-first from the start
+    by_id = {d.id: d for d in dfa_list}
+    new_states: Dict[int, DFAState] = {}
+    order: List[int] = []
+
+    def state_for(block_index: int) -> DFAState:
+        state = new_states.get(block_index)
+        if state is None:
+            members = [by_id[q] for q in partition[block_index]]
+            state = DFAState(len(order), frozenset().union(*[m.nfa_states for m in members]))
+            accepting = [m for m in members if m.is_accept]
+            if accepting:
+                state.is_accept = True
+                state.token_type = accepting[0].token_type
+                state.priority = min(m.priority for m in accepting)
+            new_states[block_index] = state
+            order.append(block_index)
+        return state
+
+    new_start = state_for(block_of[start_dfa.id])
+    i = 0
+    while i < len(order):
+        block_index = order[i]
+        i += 1
+        representative = by_id[next(iter(partition[block_index]))]
+        state = new_states[block_index]
+        for sym, target in representative.trans.items():
+            target_block = block_of[target.id]
+            if target_block != dead_block:
+                state.trans[sym] = state_for(target_block)
+
+    return new_start, [new_states[b] for b in order]
+
+
+def build_transition_table(dfa_list: List[DFAState],
+                           alphabet: Set[str]) -> Tuple[array, array, List[Optional[str]]]:
+    """Flatten DFA states into a dense transition table over character classes
+
+    Characters that every state sends to the same place (e.g. all letters but the
+    few starting a keyword) share one equivalence class, so a row has one column
+    per class instead of one per character.
+
+    Args:
+        dfa_list: All DFA states; state ids must be 0..len(dfa_list)-1
+        alphabet: Alphabet of the DFA
+
+    Returns:
+        trans_table: One contiguous array('i') of len(dfa_list) rows;
+                     trans_table[state_id * num_classes + class_of[ord(ch)]] -> next
+                     state id, -1 if none
+        class_of: Class id of each character code; class 0 has no transitions
+        accept_token: Token type accepted by each state, None if not accepting
+
+    Note:
+        class_of is at least 128 long (ASCII) and grows to cover the largest code
+        point in the alphabet; characters beyond it have no transition.
+        num_classes is len(trans_table) // len(accept_token).
+    """
+    num_states = len(dfa_list)
+    columns: Dict[int, List[int]] = {ord(ch): [-1] * num_states for ch in alphabet}
+    accept_token: List[Optional[str]] = [None] * num_states
+    for d in dfa_list:
+        for ch, target in d.trans.items():
+            columns[ord(ch)][d.id] = target.id
+        if d.is_accept:
+            accept_token[d.id] = d.token_type
+
+    # Group characters by identical column; the all-dead column is class 0
+    class_ids: Dict[Tuple[int, ...], int] = {(-1,) * num_states: 0}
+    codes = [0] * max([128] + [code + 1 for code in columns])
+    for code in sorted(columns):
+        codes[code] = class_ids.setdefault(tuple(columns[code]), len(class_ids))
+    class_of = array('B' if len(class_ids) <= 256 else 'I', codes)
+
+    num_classes = len(class_ids)
+    trans_table = array('i', [-1]) * (num_states * num_classes)
+    for column, cls in class_ids.items():
+        for state_id, target_id in enumerate(column):
+            trans_table[state_id * num_classes + cls] = target_id
+    return trans_table, class_of, accept_token
+
+
+def generate_scanner_source(start_dfa: DFAState, dfa_list: List[DFAState]) -> Optional[str]:
+    """Generate Python source of a scanner hard-coded for one DFA
+
+    The generated ``scan(text)`` returns the same tuple as ``scan_spans`` but has
+    the automaton baked in as code instead of interpreting the table:
+      - the first character of a token is dispatched through dict literals;
+        single-character tokens are resolved right there without a call
+      - every other state becomes straight-line code with literal character
+        tests, a self-loop becomes a tight ``while`` over its characters, and
+        successors are inlined (states reached from several places, or from a
+        state with a wide fan-out, become helper functions)
+
+    A single combined ``re`` alternation of all rules is not used instead: ``re``
+    takes the first alternative that matches rather than the longest (``if``
+    would win over ``ifx``), and on the PL/0 sample it also scans slower than
+    this generated code.
+
+    Args:
+        start_dfa: DFA start state
+        dfa_list: All DFA states
+
+    Returns:
+        Source code, or None if the DFA does not fit this shape (a cycle other
+        than self-loops, or a start state that loops/accepts); such automata
+        keep using the table-driven scan_spans
+    """
+    if start_dfa.is_accept or any(target is start_dfa for target in start_dfa.trans.values()):
+        return None
+
+    # Predecessor sets and cycle check, ignoring self-loops
+    preds: Dict[int, Set[int]] = {d.id: set() for d in dfa_list}
+    for d in dfa_list:
+        for target in d.trans.values():
+            if target is not d:
+                preds[target.id].add(d.id)
+    if preds[start_dfa.id]:
+        return None
+    visiting: Set[int] = set()
+    done: Set[int] = set()
+
+    def acyclic(d: DFAState) -> bool:
+        visiting.add(d.id)
+        for target in set(d.trans.values()):
+            if target is d or target.id in done:
+                continue
+            if target.id in visiting or not acyclic(target):
+                return False
+        visiting.discard(d.id)
+        done.add(d.id)
+        return True
+
+    if not acyclic(start_dfa):
+        return None
+
+    def successors(d: DFAState) -> Dict[int, List[str]]:
+        by_target: Dict[int, List[str]] = {}
+        for ch, target in d.trans.items():
+            if target is not d:
+                by_target.setdefault(target.id, []).append(ch)
+        return by_target
+
+    by_id = {d.id: d for d in dfa_list}
+    # Single-character tokens: accepting states right after start with no way out
+    leaf_token: Dict[str, str] = {}
+    first_step: Dict[str, int] = {}
+    for ch, target in start_dfa.trans.items():
+        if target.is_accept and not target.trans:
+            leaf_token[ch] = target.token_type
+        else:
+            first_step[ch] = target.id
+
+    # States that become helper functions
+    functions = set(first_step.values())
+    functions.update(d.id for d in dfa_list if len(preds[d.id]) > 1)
+    for d in dfa_list:
+        if d is not start_dfa and len(successors(d)) > _MAX_INLINE_BRANCHES:
+            functions.update(successors(d))
+
+    lines: List[str] = []
+    tables: List[str] = []
+
+    def chars_test(subject: str, chars: List[str]) -> str:
+        if len(chars) == 1:
+            return f"{subject} == {chars[0]!r}"
+        return f"{subject} in {''.join(sorted(chars))!r}"
+
+    def emit_state(d: DFAState, depth: int) -> None:
+        # Entered right after consuming the character that led to d
+        ind = '    ' * depth
+        loop_chars = sorted(ch for ch, target in d.trans.items() if target is d)
+        if loop_chars:
+            lines.append(f"{ind}while pos < n and {chars_test('text[pos]', loop_chars)}:")
+            lines.append(f"{ind}    pos += 1")
+        if d.is_accept:
+            lines.append(f"{ind}last_pos = pos")
+            lines.append(f"{ind}last_tok = {d.token_type!r}")
+
+        by_target = successors(d)
+        if len(by_target) > _MAX_INLINE_BRANCHES:
+            entries = ', '.join(f"{ch!r}: _s{target_id}"
+                                for target_id in sorted(by_target)
+                                for ch in sorted(by_target[target_id]))
+            tables.append(f"_D{d.id} = {{{entries}}}")
+            lines.append(f"{ind}if pos < n:")
+            lines.append(f"{ind}    step = _D{d.id}.get(text[pos])")
+            lines.append(f"{ind}    if step is not None:")
+            lines.append(f"{ind}        return step(text, pos + 1, n, last_pos, last_tok)")
+        elif by_target:
+            lines.append(f"{ind}if pos < n:")
+            lines.append(f"{ind}    ch = text[pos]")
+            keyword = 'if'
+            for target_id in sorted(by_target):
+                lines.append(f"{ind}    {keyword} {chars_test('ch', by_target[target_id])}:")
+                keyword = 'elif'
+                if target_id in functions:
+                    lines.append(f"{ind}        return _s{target_id}(text, pos + 1, n, last_pos, last_tok)")
+                else:
+                    lines.append(f"{ind}        pos += 1")
+                    emit_state(by_id[target_id], depth + 2)
+        lines.append(f"{ind}return last_pos, last_tok")
+
+    for d in dfa_list:
+        if d.id in functions:
+            lines.append(f"def _s{d.id}(text, pos, n, last_pos, last_tok):")
+            emit_state(d, 1)
+            lines.append("")
+
+    lines.append(f"_LEAF = {leaf_token!r}")
+    lines.append("_FIRST = {" + ', '.join(f"{ch!r}: _s{first_step[ch]}" for ch in sorted(first_step)) + "}")
+    lines.append("")
+    lines.append('''def scan(text):
+    starts = []
+    ends = []
+    types = []
+    skip = _SKIP_RE.match
+    leaf = _LEAF.get
+    first = _FIRST.get
+    pos = 0
+    n = len(text)
+    while pos < n:
+        ch = text[pos]
+        if ch == ' ':
+            pos += 1
+            if pos >= n:
+                break
+            ch = text[pos]
+        if ch.isspace() or (ch == '/' and text.startswith('//', pos)):
+            pos = skip(text, pos).end()
+            if pos >= n:
+                break
+            if text.startswith('//', pos):
+                break
+            ch = text[pos]
+        tok = leaf(ch)
+        if tok is not None:
+            starts.append(pos)
+            pos += 1
+            ends.append(pos)
+            types.append(tok)
+            continue
+        step = first(ch)
+        if step is None:
+            return starts, ends, types, pos, False
+        end, tok = step(text, pos + 1, n, pos, None)
+        if tok is None:
+            return starts, ends, types, pos, False
+        starts.append(pos)
+        ends.append(end)
+        types.append(tok)
+        pos = end
+    return starts, ends, types, pos, True
+''')
+    lines.extend(tables)
+    lines.append("")
+    return '\n'.join(lines)
+
+
+def compile_scanner(source: str) -> Callable:
+    """exec source from generate_scanner_source and return its scan function"""
+    namespace: Dict[str, object] = {'_SKIP_RE': _SKIP_RE}
+    exec(compile(source, '<generated-scanner>', 'exec'), namespace)
+    return namespace['scan']
+
+
+def code_units(text: str) -> Sequence[int]:
+    """Code points of text as an indexable int sequence with the same offsets
+
+    ASCII text (the common case for source code) becomes bytes; anything else is
+    encoded to UTF-32 in one C-level pass and viewed as unsigned ints. Indexing
+    either yields ints directly, saving an ord() per character in the scan loop.
+    """
+    if text.isascii():
+        return text.encode('ascii')
+    return memoryview(text.encode(_UTF32)).cast('I')
+
+
+def scan_spans(text: str, table: array, class_of: array, accept_token: List[Optional[str]],
+               start_id: int) -> Tuple[List[int], List[int], List[str], int, bool]:
+    """Scan kernel: DFA longest-match over text, returning token spans
+
+    Only touches locals and flat tables, so the per-character loop stays tight;
+    Token objects and line/column numbers are produced by the caller.
+
+    Args:
+        text: Input source code text
+        table: Dense transition table from build_transition_table
+        class_of: Character class of each code point, from build_transition_table
+        accept_token: Accepted token type per DFA state
+        start_id: DFA start state id
+
+    Returns:
+        starts, ends, types: Parallel lists describing each token
+        stop: Position where scanning stopped (end of input, start of a trailing
+              comment, or the offending character on error)
+        ok: False if scanning stopped on an unrecognized character
+    """
+    starts: List[int] = []
+    ends: List[int] = []
+    types: List[str] = []
+    num_classes = len(table) // len(accept_token)
+    width = len(class_of)
+    codes = code_units(text)
+    skip = _SKIP_RE.match
+    pos = 0
+    n = len(text)
+
+    while pos < n:
+        # Skip whitespace characters and line comments
+        ch = text[pos]
+        if ch == ' ':
+            # Single-space separators are the common case; not worth a regex call
+            pos += 1
+            if pos >= n:
+                break
+            ch = text[pos]
+        if ch.isspace() or (ch == '/' and text.startswith('//', pos)):
+            pos = skip(text, pos).end()
+            if pos >= n:
+                break
+            # Comment on the last line (no newline): stop scanning
+            if text.startswith('//', pos):
+                break
+
+        # Use DFA for longest match
+        state = start_id
+        last_accept_token: Optional[str] = None
+        last_accept_pos = pos
+        current_pos = pos
+
+        # Match as far forward as possible
+        while current_pos < n:
+            code = codes[current_pos]
+            # If character not in alphabet, stop matching
+            if code >= width:
+                break
+            state = table[state * num_classes + class_of[code]]
+            if state < 0:
+                break
+            current_pos += 1
+            # Record last accepting state (longest match)
+            if accept_token[state] is not None:
+                last_accept_token = accept_token[state]
+                last_accept_pos = current_pos
+
+        if last_accept_token is None:
+            return starts, ends, types, pos, False
+
+        starts.append(pos)
+        ends.append(last_accept_pos)
+        types.append(last_accept_token)
+        pos = last_accept_pos
+
+    return starts, ends, types, pos, True
+
+
 class LexerGenerator:
     """Lexer generator class
     
@@ -465,11 +1059,25 @@ class LexerGenerator:
             token_specs: List storing (name, regex_pattern) tuples
             start_dfa: DFA start state
             alphabet: Alphabet (all possible input characters)
+            trans_table: Flat dense transition table,
+                         trans_table[state_id * num_classes + class_of[ord(ch)]] -> state_id or -1
+            class_of: Character equivalence class of each code point
+            accept_token: Token type accepted by each DFA state (None if not accepting)
+            scanner_source: Source of the scanner generated for this DFA (None if
+                            the DFA does not fit the generated shape)
+            scanner: The compiled scanner_source (None if not generated)
             compiled_patterns: Compatibility attribute (deprecated, kept for testing)
         """
         self.token_specs: List[Tuple[str, str]] = []
         self.start_dfa: Optional[DFAState] = None
         self.alphabet: Set[str] = set()
+        self.trans_table: array = array('i')
+        self.class_of: array = array('B')
+        self.accept_token: List[Optional[str]] = []
+        self.scanner_source: Optional[str] = None
+        self.scanner: Optional[Callable] = None
+        # Rules the current automaton was built from
+        self._built_specs: Optional[Tuple[Tuple[str, str], ...]] = None
         # Compatibility attribute: for backward compatibility with test code
         self.compiled_patterns: List[Tuple[str, str]] = []
 
@@ -488,7 +1096,9 @@ class LexerGenerator:
             to avoid short rules being matched before longer rule subsets. For example, keywords
             should be added before identifiers.
         """
-        self.token_specs.append((token_type, regex_pattern))
+        # Interned so every Token.type of this kind is one shared object and the
+        # parser's comparisons against type-name literals hit the identity fast path
+        self.token_specs.append((intern(token_type), regex_pattern))
 
     def build(self) -> None:
         """Compile all lexical rules, generate DFA using Thompson's construction and subset construction
@@ -502,21 +1112,31 @@ class LexerGenerator:
             1. Build NFA for each rule (using Thompson's construction)
             2. Merge all NFAs into a global NFA
             3. Convert NFA to DFA using subset construction
+            4. Minimize the DFA (Hopcroft) and flatten it into a transition table
             
         Optimization:
-            - Skip rebuilding if rules haven't changed and already built
+            - Skip rebuilding if rules haven't changed since the last build
+            - Reuse the automaton built for an identical rule list in this process
         """
         if not self.token_specs:
             raise RuntimeError("No token rules added. Call add_token_rule() first.")
         
-        # Check if already built and rules unchanged (simple optimization)
-        if self.start_dfa is not None:
-            # If rule count is the same, assume rules unchanged (simple check)
-            # In practice, hash can be used for more precise judgment
+        # Rebuild only if rules were added since the last build
+        specs = tuple(self.token_specs)
+        if self.start_dfa is not None and specs == self._built_specs:
+            return
+
+        cached = _BUILD_CACHE.get(specs)
+        if cached is not None:
+            (self.start_dfa, self.alphabet, self.trans_table, self.class_of,
+             self.accept_token, self.scanner_source, self.scanner) = cached
+            self._built_specs = specs
+            self.compiled_patterns = list(specs)
             return
         
-        # Create global start state
-        global_start = NFAState()
+        # Create global start state (one id allocator shared by all rules)
+        next_id = count().__next__
+        global_start = NFAState(next_id())
         
         # Build NFA for each token rule
         for priority, (token_type, pattern) in enumerate(self.token_specs):
@@ -524,7 +1144,7 @@ class LexerGenerator:
                 # 1. Parse regular expression to AST
                 ast = RegexParser(pattern).parse()
                 # 2. Thompson's construction: AST → NFA
-                frag = thompson(ast)
+                frag = thompson(ast, next_id)
                 # 3. Mark accepting states and token information
                 for accept_state in frag.accepts:
                     accept_state.is_accept = True
@@ -537,6 +1157,20 @@ class LexerGenerator:
         
         # 5. Subset construction: NFA → DFA
         self.start_dfa, dfa_list, self.alphabet = nfa_to_dfa(global_start)
+        self.start_dfa, dfa_list = minimize_dfa(self.start_dfa, dfa_list, self.alphabet)
+
+        # 6. Flatten the DFA into a dense table indexed by (state_id, character class)
+        self.trans_table, self.class_of, self.accept_token = build_transition_table(
+            dfa_list, self.alphabet)
+
+        # 7. Hard-code the scanner for this DFA (None: keep interpreting the table)
+        self.scanner_source = generate_scanner_source(self.start_dfa, dfa_list)
+        self.scanner = (compile_scanner(self.scanner_source)
+                        if self.scanner_source is not None else None)
+
+        self._built_specs = specs
+        _BUILD_CACHE[specs] = (self.start_dfa, self.alphabet, self.trans_table, self.class_of,
+                               self.accept_token, self.scanner_source, self.scanner)
         
         # Compatibility attribute: for backward compatibility with test code
         self.compiled_patterns = [(token_type, pattern) for token_type, pattern in self.token_specs]
@@ -557,79 +1191,47 @@ class LexerGenerator:
             - Automatically skip whitespace characters and comments (line comments starting with //)
             - Track line and column numbers for error reporting
             - Use DFA longest match strategy: match the longest possible token
+            - Identifier-like lexemes (identifiers, keywords) are interned, so repeated
+              names share one string object and later dict lookups hit the fast path
         """
         if self.start_dfa is None:
             raise RuntimeError("Lexer not built. Call build() first.")
 
+        if self.scanner is not None:
+            starts, ends, types, stop, ok = self.scanner(text)
+        else:
+            starts, ends, types, stop, ok = scan_spans(
+                text, self.trans_table, self.class_of, self.accept_token, self.start_dfa.id)
+
+        # Build tokens line by line: the tokens starting on a line share its
+        # number and start offset, so no per-token newline search is needed
         tokens: List[Token] = []
-        pos = 0
+        append = tokens.append
+        i = 0
+        num_tokens = len(starts)
         line = 1
-        column = 1
-        n = len(text)
-
-        while pos < n:
-            # Skip whitespace characters
-            if text[pos].isspace():
-                if text[pos] == '\n':
-                    line += 1
-                    column = 1
-                else:
-                    column += 1
-                pos += 1
-                continue
-
-            # Handle line comments
-            if pos + 1 < n and text[pos:pos+2] == '//':
-                # Skip comment until end of line
-                end = text.find('\n', pos)
-                if end == -1:
-                    break
-                pos = end
-                continue
-
-            # Use DFA for longest match
-            state = self.start_dfa
-            last_accept_state: Optional[DFAState] = None
-            last_accept_pos = pos
-            current_pos = pos
-
-            # Match as far forward as possible
-            while current_pos < n:
-                ch = text[current_pos]
-                # If character not in alphabet, stop matching
-                if ch not in state.trans:
-                    break
-                state = state.trans[ch]
-                current_pos += 1
-                # Record last accepting state (longest match)
-                if state.is_accept:
-                    last_accept_state = state
-                    last_accept_pos = current_pos
-
-            if last_accept_state is None:
-                # Lexical error: unrecognized character
-                raise SyntaxError(
-                    f"Lexical error at line {line}, column {column}: "
-                    f"unexpected character '{text[pos]}'"
-                )
-
-            # Extract matched lexeme
-            lexeme = text[pos:last_accept_pos]
-            token = Token(
-                last_accept_state.token_type or 'UNKNOWN',
-                lexeme,
-                line,
-                column
+        line_start = 0
+        for line_text in text.split('\n'):
+            line_end = line_start + len(line_text)
+            while i < num_tokens and starts[i] <= line_end:
+                start = starts[i]
+                lexeme = text[start:ends[i]]
+                if lexeme.isidentifier():
+                    lexeme = intern(lexeme)
+                append(Token(types[i], lexeme, line, start - line_start + 1))
+                i += 1
+            line += 1
+            line_start = line_end + 1
+
+        line = text.count('\n', 0, stop) + 1
+        column = stop - text.rfind('\n', 0, stop)
+
+        if not ok:
+            # Lexical error: unrecognized character
+            raise SyntaxError(
+                f"Lexical error at line {line}, column {column}: "
+                f"unexpected character '{text[stop]}'"
             )
-            tokens.append(token)
-
-            # Update position and line/column numbers
-            pos = last_accept_pos
-            if '\n' in lexeme:
-                line += lexeme.count('\n')
-                column = len(lexeme) - lexeme.rfind('\n')
-            else:
-                column += len(lexeme)
 
         # Add EOF token
         tokens.append(Token('EOF', '', line, column))
@@ -674,14 +1276,71 @@ def generate_lexer_code(token_rules: List[Tuple[str, str]]) -> str:
         
     Returns:
         包含完整词法分析器的Python代码字符串
+
+    Note:
+        规则在生成时即编译为最小化 DFA：能生成专用扫描函数时直接写入其源码，
+        否则写入按字符等价类压缩的转移表及查表扫描循环。生成的词法分析器
+        不再在运行时逐条尝试正则。
     """
-    # 序列化token规则
+    lexer = create_lexer_from_spec(token_rules)
+
+    # 序列化token规则（仅作说明用途）
     token_rules_str = ""
     for token_type, pattern in token_rules:
         # 只转义单引号（因为使用r-string原始字符串，不需要转义反斜杠）
         escaped_pattern = pattern.replace("'", "\\'")
         token_rules_str += f"            ('{token_type}', r'{escaped_pattern}'),\n"
-    
+
+    if lexer.scanner_source is not None:
+        scan_code = lexer.scanner_source + "\n_scan = scan\n"
+    else:
+        scan_code = f'''
+# 最小化 DFA 的转移表：_TRANS[state * _NUM_CLASSES + _CLASS_OF[ord(ch)]] -> state / -1
+_CLASS_OF = {list(lexer.class_of)!r}
+_NUM_CLASSES = {len(lexer.trans_table) // len(lexer.accept_token)}
+_TRANS = {list(lexer.trans_table)!r}
+_ACCEPT = {lexer.accept_token!r}
+_START = {lexer.start_dfa.id}
+
+def _scan(text):
+    """查表扫描：返回 (starts, ends, types, stop, ok)"""
+    starts = []
+    ends = []
+    types = []
+    skip = _SKIP_RE.match
+    width = len(_CLASS_OF)
+    pos = 0
+    n = len(text)
+    while pos < n:
+        ch = text[pos]
+        if ch.isspace() or (ch == '/' and text.startswith('//', pos)):
+            pos = skip(text, pos).end()
+            if pos >= n or text.startswith('//', pos):
+                break
+        state = _START
+        last_tok = None
+        last_pos = pos
+        cur = pos
+        while cur < n:
+            code = ord(text[cur])
+            if code >= width:
+                break
+            state = _TRANS[state * _NUM_CLASSES + _CLASS_OF[code]]
+            if state < 0:
+                break
+            cur += 1
+            if _ACCEPT[state] is not None:
+                last_tok = _ACCEPT[state]
+                last_pos = cur
+        if last_tok is None:
+            return starts, ends, types, pos, False
+        starts.append(pos)
+        ends.append(last_pos)
+        types.append(last_tok)
+        pos = last_pos
+    return starts, ends, types, pos, True
+'''
+
     lexer_code = f'''
 # =============================================================================
 # 自动生成的词法分析器
@@ -694,6 +1353,9 @@ from typing import List, Optional
 @dataclass
 class Token:
     """Token数据结构"""
+    # 不带 __dict__，每个 Token 只占四个槽位
+    __slots__ = ('type', 'value', 'line', 'column')
+
     type: str
     value: str
     line: int
@@ -702,60 +1364,42 @@ class Token:
     def __repr__(self):
         return f"Token({{self.type}}, {{self.value!r}}, {{self.line}}, {{self.column}})"
 
+# 空白符与以换行结束的 // 注释，一次跳过
+_SKIP_RE = re.compile({_SKIP_RE.pattern!r})
+
+{scan_code}
+
 class GeneratedLexer:
-    """自动生成的词法分析器"""
+    """自动生成的词法分析器（基于最小化 DFA）"""
     
     def __init__(self):
         self.token_specs = [
 {token_rules_str}        ]
-        self.compiled_patterns = [(name, re.compile(pattern)) for name, pattern in self.token_specs]
     
     def tokenize(self, text: str) -> List[Token]:
         """词法分析"""
+        starts, ends, types, stop, ok = _scan(text)
+
+        # 逐行生成 Token：同一行的 Token 共享行号与行首偏移
         tokens = []
+        append = tokens.append
+        i = 0
+        num_tokens = len(starts)
         line = 1
-        column = 1
-        position = 0
-        
-        while position < len(text):
-            # 跳过空白符
-            if text[position].isspace():
-                if text[position] == '\\n':
-                    line += 1
-                    column = 1
-                else:
-                    column += 1
-                position += 1
-                continue
-            
-            # 跳过注释（//开头）
-            if position + 1 < len(text) and text[position:position+2] == '//':
-                while position < len(text) and text[position] != '\\n':
-                    position += 1
-                continue
-            
-            # 匹配token（最长匹配）
-            matched = False
-            max_len = 0
-            matched_type = None
-            matched_value = None
-            
-            for token_type, pattern in self.compiled_patterns:
-                match = pattern.match(text, position)
-                if match:
-                    match_len = match.end() - match.start()
-                    if match_len > max_len:
-                        max_len = match_len
-                        matched_type = token_type
-                        matched_value = match.group()
-                        matched = True
-            
-            if matched:
-                tokens.append(Token(matched_type, matched_value, line, column))
-                position += max_len
-                column += max_len
-            else:
-                raise SyntaxError(f"Lexical error at line {{line}}, column {{column}}: unrecognized character '{{text[position]}}'")
+        line_start = 0
+        for line_text in text.split('\\n'):
+            line_end = line_start + len(line_text)
+            while i < num_tokens and starts[i] <= line_end:
+                start = starts[i]
+                append(Token(types[i], text[start:ends[i]], line, start - line_start + 1))
+                i += 1
+            line += 1
+            line_start = line_end + 1
+
+        line = text.count('\\n', 0, stop) + 1
+        column = stop - text.rfind('\\n', 0, stop)
+        if not ok:
+            raise SyntaxError(f"Lexical error at line {{line}}, column {{column}}: unrecognized character '{{text[stop]}}'")
         
         tokens.append(Token('EOF', '', line, column))
         return tokens
@@ -7,39 +7,76 @@
 [智能提示] 使用编辑距离算法提供变量拼写错误的修复建议
 """
 
-from typing import List, Dict, Set, Optional, Tuple
-from dataclasses import dataclass
+from collections import deque
+from sys import intern
+from typing import Callable, List, Dict, Set, Optional, Tuple
 from src.compiler_generator.lexer_generator import Token
 from src.utils.smart_suggest import suggest_variable_fix
 
+# [消除硬编码] 按词法规则的正则模式对token分类时使用的模式表（集合查找，避免每条规则重建列表）
+_NUMBER_PATTERNS = frozenset({'[0-9]+', r'\d+'})
+_LEFT_PAREN_PATTERNS = frozenset({'(', r'\(', '{', r'\{', '[', r'\['})
+_RIGHT_PAREN_PATTERNS = frozenset({')', r'\)', '}', r'\}', ']', r'\]'})
+_PUNCTUATION_PATTERNS = _LEFT_PAREN_PATTERNS | _RIGHT_PAREN_PATTERNS | frozenset({
+    ';', ',', ':', '.', r'\;', r'\,', r'\:', r'\.'})
+_OPERATOR_PATTERNS = frozenset({
+    '+', '-', '*', '/', '%', r'\+', r'-', r'\*', r'\/', r'\%',
+    '=', '==', '!=', '<', '>', '<=', '>=',
+    r'\=', r'\=\=', r'\!\=', r'\<', r'\>', r'\<\=', r'\>\=',
+    '&', '|', '!', '&&', '||', r'\&', r'\|', r'\!', r'\&\&', r'\|\|'})
+_OPERATOR_CHARS = frozenset('+-*/=<>!&|%')
+
+# 符号表中普通变量的条目；所有变量共用同一个字典，只读不改
+_VAR_ENTRY = {'type': 'var'}
+
+
+# 叶子节点共用的空子节点序列
+_NO_CHILDREN = ()
+
 
-@dataclass
 class ASTNode:
     """抽象语法树(AST)节点
     
     [SDT扩展] 节点现在携带语义信息：
     - synthesized_value: 综合属性，用于代码生成（变量名、临时变量等）
+
+    说明:
+        每个文法符号都会产生一个节点，使用 __slots__ 去掉实例 __dict__。
+        带默认值的字段无法与 @dataclass 的 __slots__ 共存，因此手写 __init__/__eq__。
+        解析器创建的叶子节点（终结符、空产生式）共用空元组 _NO_CHILDREN 作为 children，
+        不再各自分配一个空列表；比较时 children 按元组比较。
     """
-    name: str
-    children: List['ASTNode'] = None
-    token: Token = None
-    synthesized_value: str = None  # SDT: 综合属性，用于存储代码生成结果
+    __slots__ = ('name', 'children', 'token', 'synthesized_value')
 
-    def __post_init__(self):
-        if self.children is None:
-            self.children = []
+    def __init__(self, name: str, children: List['ASTNode'] = None,
+                 token: Token = None, synthesized_value: str = None):
+        self.name = name
+        self.children = children if children is not None else []
+        self.token = token
+        self.synthesized_value = synthesized_value  # SDT: 综合属性，用于存储代码生成结果
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.name, tuple(self.children), self.token, self.synthesized_value) == \
+            (other.name, tuple(other.children), other.token, other.synthesized_value)
 
     def __repr__(self, indent=0):
-        prefix = "  " * indent
-        result = f"{prefix}{self.name}"
-        if self.token:
-            result += f" ('{self.token.value}')"
-        if self.synthesized_value:
-            result += f" [val={self.synthesized_value}]"
-        result += "\n"
-        for child in self.children:
-            result += child.__repr__(indent + 1)
-        return result
+        # 显式栈 + 列表拼接：避免逐层 += 带来的 O(N^2) 复制与深树递归
+        out = []
+        stack = [(self, indent)]
+        while stack:
+            node, depth = stack.pop()
+            out.append("  " * depth)
+            out.append(node.name)
+            if node.token:
+                out.append(f" ('{node.token.value}')")
+            if node.synthesized_value:
+                out.append(f" [val={node.synthesized_value}]")
+            out.append("\n")
+            for child in reversed(node.children):
+                stack.append((child, depth + 1))
+        return "".join(out)
 
 
 class ParseError(Exception):
@@ -56,6 +93,10 @@ class ParserGenerator:
     - 实现真正的一遍扫描编译
     """
 
+    # 预先生成的临时变量名/标签名（t1..t1024, L1..L1024），编号超出时才现场格式化
+    _TEMP_NAMES: Tuple[str, ...] = tuple(f"t{i}" for i in range(1, 1025))
+    _LABEL_NAMES: Tuple[str, ...] = tuple(f"L{i}" for i in range(1, 1025))
+
     def __init__(self, lexer_rules: List[Tuple[str, str]] = None, enable_sdt: bool = True):
         """初始化解析器
         
@@ -72,15 +113,19 @@ class ParserGenerator:
         self.first_sets: Dict[str, Set[str]] = {}
         self.follow_sets: Dict[str, Set[str]] = {}
         self.select_sets: Dict[str, List[Set[str]]] = {}  # 存储每个非终结符的产生式SELECT集合
+        self._dispatch: Dict[str, Dict[str, int]] = {}  # 预测分析表：非终结符 -> {token类型: 产生式下标}
         self.epsilon_symbol: str = 'EPSILON'
         self.analysis_sets_built = False
         
         # [SDT] 语法制导翻译相关属性
         self.enable_sdt = enable_sdt
         self.code_buffer: List[str] = []  # 存储生成的中间代码
+        self.retain_ast: bool = True  # 为 False 时，子树的翻译完成后即释放（只需要中间代码时可降低峰值内存）
         self.temp_counter: int = 0  # 临时变量计数器
         self.label_counter: int = 0  # 标签计数器
         self.symbol_table: Dict[str, Dict] = {}  # 符号表
+        self._defined_vars_snapshot: Optional[Set[str]] = None  # 已定义变量名集合的缓存（供拼写建议使用）
+        self._suggestion_cache: Dict[str, Optional[str]] = {}  # 未定义变量名 -> 拼写建议（快照更新时清空）
         
         # [回填技术] 用于控制流语句的回填
         self.backpatch_stack: List[Dict] = []  # 回填栈，记录需要回填的位置
@@ -125,7 +170,7 @@ class ParserGenerator:
                 self.identifier_tokens.add(token_type)
             
             # 识别数字token（正则表达式匹配数字模式）
-            elif re.search(r'\[0-9\]', pattern) or pattern in ['[0-9]+', r'\d+']:
+            elif re.search(r'\[0-9\]', pattern) or pattern in _NUMBER_PATTERNS:
                 self.number_tokens.add(token_type)
             
             # 识别关键字token（固定字符串，且是字母）
@@ -133,120 +178,213 @@ class ParserGenerator:
                 self.keyword_tokens.add(token_type)
             
             # 识别括号和标点符号
-            elif pattern in ['(', ')', r'\(', r'\)', '{', '}', r'\{', r'\}', '[', ']', r'\[', r'\]', 
-                            ';', ',', ':', '.', r'\;', r'\,', r'\:', '\.']:
+            elif pattern in _PUNCTUATION_PATTERNS:
                 self.punctuation_tokens.add(token_type)
                 # 识别左括号
-                if pattern in ['(', r'\(', '{', r'\{', '[', r'\[']:
+                if pattern in _LEFT_PAREN_PATTERNS:
                     self.left_paren_tokens.add(token_type)
                 # 识别右括号
-                elif pattern in [')', r'\)', '}', r'\}', ']', r'\]']:
+                elif pattern in _RIGHT_PAREN_PATTERNS:
                     self.right_paren_tokens.add(token_type)
             
             # 识别操作符（算术、比较、逻辑等）
-            elif pattern in ['+', '-', '*', '/', '%', r'\+', r'-', r'\*', r'\/', r'\%',
-                           '=', '==', '!=', '<', '>', '<=', '>=', 
-                           r'\=', r'\=\=', r'\!\=', r'\<', r'\>', r'\<\=', r'\>\=',
-                           '&', '|', '!', '&&', '||', r'\&', r'\|', r'\!', r'\&\&', r'\|\|']:
+            elif pattern in _OPERATOR_PATTERNS:
                 self.operator_tokens.add(token_type)
             
             # 其他未分类的token，默认为操作符（除非是已知的标点）
             else:
                 # 如果包含特殊字符，可能是操作符
-                if any(c in pattern for c in ['+', '-', '*', '/', '=', '<', '>', '!', '&', '|', '%']):
+                if not _OPERATOR_CHARS.isdisjoint(pattern):
                     self.operator_tokens.add(token_type)
                 # 否则可能是标点或其他
                 else:
                     self.punctuation_tokens.add(token_type)
     
+    def _intern_symbols(self):
+        """[符号整数化] 为文法符号分配稠密整数编号，并把文法改写为编号形式
+
+        说明:
+            终结符（下标 0 为 EPSILON 伪终结符）编号 0..n_terms-1，非终结符紧随其后，
+            判断终结符只需 sid < self._n_terms，不再做 startswith/集合查找。
+            FIRST/FOLLOW 用以终结符编号为位的 int 位集表示，并集即一次 |。
+            未定义的裸符号按原语义视为没有产生式的非终结符。
+        """
+        term_names = [self.epsilon_symbol] + sorted(self.terminals - {self.epsilon_symbol})
+        term_id = {name: i for i, name in enumerate(term_names)}
+        n_terms = len(term_names)
+        nt_names = sorted(self.non_terminals)
+        nt_index = {name: j for j, name in enumerate(nt_names)}
+
+        token_type_of = self._token_type_of
+
+        def encode(symbol: str) -> int:
+            token_type = token_type_of.get(symbol)
+            if token_type is not None:
+                return term_id[token_type]
+            if symbol in term_id and symbol in self.terminals:
+                return term_id[symbol]
+            j = nt_index.get(symbol)
+            if j is None:
+                # 未定义符号：追加一个没有产生式的非终结符编号
+                j = nt_index[symbol] = len(nt_index)
+            return n_terms + j
+
+        self._term_names: List[str] = term_names
+        self._term_id: Dict[str, int] = term_id
+        self._n_terms: int = n_terms
+        self._nt_names: List[str] = nt_names
+        self._nt_index: Dict[str, int] = nt_index
+        grammar_ids = [[[encode(symbol) for symbol in production] for production in self.grammar[name]]
+                       for name in nt_names]
+        grammar_ids.extend([] for _ in range(len(nt_index) - len(nt_names)))
+        self._grammar_ids: List[List[List[int]]] = grammar_ids
+
+    def _decode_terminals(self, mask: int) -> Set[str]:
+        """把终结符位集还原为终结符名集合"""
+        names = self._term_names
+        result = set()
+        while mask:
+            low = mask & -mask
+            result.add(names[low.bit_length() - 1])
+            mask ^= low
+        return result
+
     def _compute_first_sets(self):
-        """[算法核心] 迭代计算所有符号的 FIRST 集合。"""
-        self.first_sets = {}
-        for non_term in self.non_terminals:
-            self.first_sets[non_term] = set()
-
-        changed = True
-        while changed:
-            changed = False
-            for X in self.non_terminals:
-                for production in self.grammar[X]:
-                    # 修复：将 current_len 的获取移到处理每个产生式之前
-                    # 这样即使产生式为空(epsilon)，current_len 也能被正确初始化
-                    current_len = len(self.first_sets[X])
-
-                    can_all_derive_epsilon = True
-                    for Y in production:
-                        if self._is_terminal(Y):
-                            token_type = Y[1:-1] if Y.startswith("'") else Y
-                            self.first_sets[X].add(token_type)
-                            can_all_derive_epsilon = False
-                            break
-                        else:
-                            first_Y_without_epsilon = self.first_sets.get(Y, set()) - {self.epsilon_symbol}
-                            self.first_sets[X].update(first_Y_without_epsilon)
-                            if self.epsilon_symbol not in self.first_sets.get(Y, set()):
-                                can_all_derive_epsilon = False
-                                break
+        """[算法核心] 工作表法计算所有符号的 FIRST 集合。
+
+        说明:
+            在整数化的文法上以位集计算：先将所有产生式入队；弹出产生式 (X, k) 时
+            只重新计算它对 FIRST(X) 的贡献，若 FIRST(X) 增长，再把右部引用了 X 的
+            产生式重新入队，避免每轮都重扫全部产生式。
+        """
+        self._intern_symbols()
+        n_terms = self._n_terms
+        grammar_ids = self._grammar_ids
+        eps_bit = 1  # EPSILON 的编号为 0
+        first = [0] * len(grammar_ids)
+
+        # dependents[j]: 右部含第 j 个非终结符的产生式 (X, 产生式下标)
+        dependents: List[List[Tuple[int, int]]] = [[] for _ in grammar_ids]
+        worklist = deque()
+        for X, productions in enumerate(grammar_ids):
+            for k, production in enumerate(productions):
+                worklist.append((X, k))
+                for sid in production:
+                    if sid >= n_terms:
+                        dependents[sid - n_terms].append((X, k))
+        queued = set(worklist)
+
+        while worklist:
+            item = worklist.popleft()
+            queued.discard(item)
+            X, k = item
+
+            contribution = 0
+            for sid in grammar_ids[X][k]:
+                if sid < n_terms:
+                    contribution |= 1 << sid
+                    break
+                first_Y = first[sid - n_terms]
+                if not first_Y & eps_bit:
+                    contribution |= first_Y
+                    break
+                contribution |= first_Y & ~eps_bit
+            else:
+                # 所有符号都可推导出 ε（含空产生式）
+                contribution |= eps_bit
 
-                    if can_all_derive_epsilon or not production:
-                        self.first_sets[X].add(self.epsilon_symbol)
+            updated = first[X] | contribution
+            if updated != first[X]:
+                first[X] = updated
+                for dep in dependents[X]:
+                    if dep not in queued:
+                        queued.add(dep)
+                        worklist.append(dep)
 
-                    if current_len != len(self.first_sets[X]):
-                        changed = True
+        self._first_masks: List[int] = first
+        self.first_sets = {name: self._decode_terminals(first[j]) for j, name in enumerate(self._nt_names)}
 
     def _compute_follow_sets(self):
-        """[算法核心] 迭代计算所有非终结符的 FOLLOW 集合。"""
-        self.follow_sets = {}
-        for non_term in self.non_terminals:
-            self.follow_sets[non_term] = set()
+        """[算法核心] 工作表法计算所有非终结符的 FOLLOW 集合。
 
-        if self.start_symbol:
-            self.follow_sets[self.start_symbol].add('EOF')
-
-        changed = True
-        while changed:
-            changed = False
-            for A in self.non_terminals:
-                for production in self.grammar[A]:
-                    for i, B in enumerate(production):
-                        if B not in self.non_terminals:
-                            continue
-
-                        beta = production[i + 1:]
-                        current_len = len(self.follow_sets[B])  # 记录初始长度
-
-                        if beta:
-                            first_beta = self._get_first_set_for_sequence(beta)
-                            self.follow_sets[B].update(first_beta - {self.epsilon_symbol})
-                            if self._sequence_can_derive_epsilon(beta):
-                                self.follow_sets[B].update(self.follow_sets.get(A, set()))
-                        else:
-                            self.follow_sets[B].update(self.follow_sets.get(A, set()))
+        说明:
+            对产生式 A -> α B β：FIRST(β) - {ε} 是 FOLLOW(B) 的固定部分，从右向左
+            扫描产生式时顺带累积，只算一次；若 β 可推导出 ε，则记一条传播边
+            A -> B（FOLLOW(A) ⊆ FOLLOW(B)）。之后只沿传播边把增长的 FOLLOW
+            集合往下推，直到没有非终结符再变化。
+        """
+        n_terms = self._n_terms
+        n_real = len(self._nt_names)
+        grammar_ids = self._grammar_ids
+        first = self._first_masks
+        eps_bit = 1
+        follow = [0] * len(grammar_ids)
 
-                        # 检查是否有变化
-                        if current_len != len(self.follow_sets[B]):
-                            changed = True
+        if self.start_symbol:
+            follow[self._nt_index[self.start_symbol]] |= 1 << self._term_id['EOF']
+
+        # propagate_to[A]: FOLLOW(A) 需要并入的非终结符
+        propagate_to: List[Set[int]] = [set() for _ in grammar_ids]
+        for A in range(n_real):
+            for production in grammar_ids[A]:
+                trailer = 0            # FIRST(β) - {ε}
+                trailer_nullable = True
+                for sid in reversed(production):
+                    if sid < n_terms:
+                        trailer = (1 << sid) & ~eps_bit
+                        trailer_nullable = False
+                        continue
+                    B = sid - n_terms
+                    if B < n_real:
+                        follow[B] |= trailer
+                        if trailer_nullable:
+                            propagate_to[A].add(B)
+                    first_B = first[B]
+                    if first_B & eps_bit:
+                        trailer |= first_B & ~eps_bit
+                    else:
+                        trailer = first_B
+                        trailer_nullable = False
+
+        worklist = deque(A for A in range(n_real) if follow[A])
+        queued = set(worklist)
+        while worklist:
+            A = worklist.popleft()
+            queued.discard(A)
+            follow_A = follow[A]
+            for B in propagate_to[A]:
+                updated = follow[B] | follow_A
+                if updated != follow[B]:
+                    follow[B] = updated
+                    if B not in queued:
+                        queued.add(B)
+                        worklist.append(B)
+
+        self._follow_masks: List[int] = follow
+        self.follow_sets = {name: self._decode_terminals(follow[j]) for j, name in enumerate(self._nt_names)}
+
+    def _first_mask_of_sequence(self, sequence_ids: List[int], start: int = 0) -> int:
+        """[位集] 计算编号序列 sequence_ids[start:] 的 FIRST 位集
 
-    def _get_first_set_for_sequence(self, sequence: List[str]) -> Set[str]:
-        first_set = set()
-        for Y in sequence:
-            if self._is_terminal(Y):
-                token_type = Y[1:-1] if Y.startswith("'") else Y
-                first_set.add(token_type)
-                return first_set
-            else:
-                first_set.update(self.first_sets.get(Y, set()) - {self.epsilon_symbol})
-                if self.epsilon_symbol not in self.first_sets.get(Y, set()):
-                    return first_set
-        first_set.add(self.epsilon_symbol)
-        return first_set
+        返回:
+            终结符位集；序列可推导出 ε 时包含 ε 位（第 0 位）
 
-    def _sequence_can_derive_epsilon(self, sequence: List[str]) -> bool:
-        if not sequence: return True
-        for Y in sequence:
-            if self._is_terminal(Y): return False
-            if self.epsilon_symbol not in self.first_sets.get(Y, set()): return False
-        return True
+        说明:
+            不做记忆化：FOLLOW 在一次从右向左的扫描中顺带累积后缀的 FIRST，
+            不调用本函数；SELECT 对每个产生式只调用一次，缓存不会命中。
+        """
+        n_terms = self._n_terms
+        first = self._first_masks
+        acc = 0
+        for k in range(start, len(sequence_ids)):
+            sid = sequence_ids[k]
+            if sid < n_terms:
+                return acc | (1 << sid)
+            first_Y = first[sid - n_terms]
+            if not first_Y & 1:
+                return acc | first_Y
+            acc |= first_Y & ~1
+        return acc | 1
 
     def _eliminate_immediate_left_recursion(self, A: str):
         alphas, betas = [], []
@@ -273,26 +411,28 @@ class ParserGenerator:
             new_A_productions.append(beta + [A_tail])
         self.grammar[A] = new_A_productions
 
-    def _check_potential_indirect_recursion(self, start_sym: str, target_sym: str, visited: Set[str] = None) -> bool:
+    def _left_corner_reachers(self, target_sym: str, reverse_edges: Dict[str, Set[str]]) -> Set[str]:
         """
-        [新增辅助方法] 检查是否存在从 start_sym 开始，经过推导首字符能到达 target_sym 的路径。
+        [新增辅助方法] 求所有经过推导首字符能到达 target_sym 的非终结符（含其自身）。
         用于判断是否真的需要进行非左递归的代换。
+
+        参数:
+            target_sym: 目标非终结符
+            reverse_edges: "首符号"图的反向边：首符号 -> 以它开头的产生式所属的非终结符
+
+        说明:
+            只有产生式的第一个符号会导致左递归，因此在"首符号"图上从 target_sym
+            反向做一次广度优先搜索，即可一次回答所有"Aj 能否到达 target_sym"的询问，
+            不必对每个 Aj 各做一遍深度优先搜索。
         """
-        if visited is None: visited = set()
-        if start_sym == target_sym: return True
-        if start_sym in visited: return False
-
-        visited.add(start_sym)
-
-        # 我们只关心产生式的第一个符号，因为只有第一个符号会导致左递归
-        for prod in self.grammar.get(start_sym, []):
-            if not prod: continue
-            first_symbol = prod[0]
-            # 如果第一个符号是非终结符，则继续递归检查
-            if first_symbol in self.non_terminals:
-                if self._check_potential_indirect_recursion(first_symbol, target_sym, visited):
-                    return True
-        return False
+        reachers = {target_sym}
+        worklist = [target_sym]
+        while worklist:
+            for sym in reverse_edges.get(worklist.pop(), ()):
+                if sym not in reachers:
+                    reachers.add(sym)
+                    worklist.append(sym)
+        return reachers
 
     def _eliminate_left_recursion(self):
         """
@@ -302,15 +442,37 @@ class ParserGenerator:
         """
         non_terminals_list = sorted(list(self.non_terminals))
 
+        # "首符号"图的反向边。每轮只会改写 Ai（及新建的 Ai_TAIL）的产生式，
+        # 因此只需在每轮前后撤下、重新登记这两个符号的边，而不必每轮重建
+        reverse_edges: Dict[str, Set[str]] = {}
+
+        def link(sym: str):
+            for prod in self.grammar.get(sym, ()):
+                if prod and not prod[0].startswith("'"):
+                    reverse_edges.setdefault(prod[0], set()).add(sym)
+
+        def unlink(sym: str):
+            for prod in self.grammar.get(sym, ()):
+                if prod and prod[0] in reverse_edges:
+                    reverse_edges[prod[0]].discard(sym)
+
+        for sym in self.grammar:
+            link(sym)
+
         for i in range(len(non_terminals_list)):
             Ai = non_terminals_list[i]
+            # 本轮只会改写 Ai 自身的产生式，而到达 Ai 的路径不经过 Ai 的出边，
+            # 所以能到达 Ai 的集合在本轮内不变，只需计算一次
+            reachers = self._left_corner_reachers(Ai, reverse_edges)
+            unlink(Ai)
+            unlink(Ai + '_TAIL')
             for j in range(i):
                 Aj = non_terminals_list[j]
 
                 # [优化关键点]
                 # 只有当 Aj 能推导出以 Ai 开头的串时（即存在 Ai -> Aj ... -> Ai ... 的风险），
                 # 我们才执行代换。否则保留 S -> A 'a' 这种结构。
-                if not self._check_potential_indirect_recursion(Aj, Ai):
+                if Aj not in reachers:
                     continue
 
                 new_productions_for_Ai = []
@@ -328,12 +490,15 @@ class ParserGenerator:
 
             if Ai in self.grammar:
                 self._eliminate_immediate_left_recursion(Ai)
+            link(Ai)
+            link(Ai + '_TAIL')
 
-        self._identify_symbols()
+        # 代换与消除直接左递归不会删去任何符号，唯一新增的 Ai_TAIL 已登记到
+        # non_terminals 中，因此无需再调用 _identify_symbols() 全量重扫文法
 
     def _perform_left_factoring(self):
-        """对文法进行左因子提取"""
-        new_grammar = self.grammar.copy()
+        """对文法进行左因子提取（直接在 self.grammar 上修改）"""
+        grammar = self.grammar
         counter = 0
         # 迭代处理，直到所有非终结符都没有公共左因子
         non_terminals_to_check = set(self.grammar.keys())
@@ -345,75 +510,38 @@ class ParserGenerator:
             A = non_terminals_to_check.pop()
             max_iterations -= 1
 
-            productions = new_grammar.get(A, [])
+            productions = grammar.get(A, [])
             if not productions: continue
 
-            # 1. 对产生式列表进行排序，便于寻找公共前缀
-            # 排序规则：按符号类型和长度，以确保稳定性
+            # 1. 对产生式列表进行排序，具有相同首符号的产生式排在一起
+            # 排序规则：按符号序列的字典序，以确保稳定性（也决定了 _LF_TAIL_n 的编号顺序）
             sorted_productions = sorted(productions)
 
-            groups = []  # 存储分组后的产生式：[[prod1, prod2], [prod3], ...]
+            new_productions_for_A = []
             i = 0
             while i < len(sorted_productions):
-                current_prod = sorted_productions[i]
-                current_group = [current_prod]
+                first_prod = sorted_productions[i]
 
-                # 寻找与 current_prod 具有公共前缀的所有产生式
+                # 首符号相同的一段产生式为一组（空产生式单独成组）
                 j = i + 1
-                while j < len(sorted_productions):
-                    next_prod = sorted_productions[j]
-
-                    # 寻找 current_prod 和 next_prod 之间的公共前缀
-                    alpha = []
-                    min_len = min(len(current_prod), len(next_prod))
-                    for k in range(min_len):
-                        if current_prod[k] == next_prod[k]:
-                            alpha.append(current_prod[k])
-                        else:
-                            break
-
-                    # 如果公共前缀非空，则将 next_prod 视为同一组的候选项
-                    if alpha:
-                        # 确保 current_group 存储的是具有最长公共前缀的组
-                        # 这里的逻辑比较复杂，为了保证找到最长的公共前缀，我们采用贪婪策略
-                        # 简化处理：我们只检查第一个符号是否相同，如果有公共前缀，就分组
-                        # 但为了提取最长公共前缀，我们应该使用更精细的逻辑。
-                        # 重新简化：只检查第一个符号，然后对组内寻找最长公共前缀
-                        if current_prod and next_prod and current_prod[0] == next_prod[0]:
-                            current_group.append(next_prod)
-                            j += 1
-                        else:
-                            break
-                    else:
-                        break  # 没有公共前缀，结束这个组的寻找
+                if first_prod:
+                    while j < len(sorted_productions) and sorted_productions[j][0] == first_prod[0]:
+                        j += 1
+                group = sorted_productions[i:j]
+                i = j
 
-                groups.append(current_group)
-                i += len(current_group)  # 跳过已经分组的产生式
-
-            new_productions_for_A = []
-
-            for group in groups:
                 if len(group) < 2:
                     new_productions_for_A.extend(group)
                     continue
 
                 # 寻找组内所有产生式的最长公共前缀 (Alpha)
-                # 假设 group 不为空
-                alpha = []
-                min_len = min(len(p) for p in group)
-
-                for i_sym in range(min_len):
-                    current_symbol = group[0][i_sym]
-                    # 检查组内所有产生式在 i_sym 位置是否都匹配
-                    if all(len(p) > i_sym and p[i_sym] == current_symbol for p in group[1:]):
-                        alpha.append(current_symbol)
-                    else:
-                        break
-
-                if not alpha:
-                    # 没有公共前缀，或者公共前缀为空串
-                    new_productions_for_A.extend(group)
-                    continue
+                # 组内产生式按字典序排列，整组的最长公共前缀就是首、尾两个产生式的最长公共前缀
+                last_prod = group[-1]
+                min_len = min(len(first_prod), len(last_prod))
+                k = 0
+                while k < min_len and first_prod[k] == last_prod[k]:
+                    k += 1
+                alpha = first_prod[:k]
 
                 # 找到最长公共前缀 alpha，现在执行提取操作
                 new_non_terminal = f"{A}_LF_TAIL_{counter}"
@@ -428,46 +556,66 @@ class ParserGenerator:
                 if len(new_tail_productions) > 1:
                     non_terminals_to_check.add(new_non_terminal)
 
-                new_grammar[new_non_terminal] = new_tail_productions
+                grammar[new_non_terminal] = new_tail_productions
+                self.non_terminals.add(new_non_terminal)
                 new_productions_for_A.append(alpha + [new_non_terminal])
 
-            new_grammar[A] = new_productions_for_A
-
-        self.grammar = new_grammar
-        self._identify_symbols()
+            grammar[A] = new_productions_for_A
 
     def _precompute_select_sets(self):
-        """预计算所有产生式的SELECT集合，用于高效解析"""
-        self.select_sets = {}
-        for non_terminal in self.non_terminals:
-            self.select_sets[non_terminal] = []
-            for production in self.grammar[non_terminal]:
-                select_set = self._compute_select_set(non_terminal, production)
-                self.select_sets[non_terminal].append(select_set)
+        """预计算所有产生式的SELECT集合，用于高效解析
 
-    def _compute_select_set(self, non_terminal: str, production: List[str]) -> Set[str]:
-        first_alpha = self._get_first_set_for_sequence(production)
-        if self.epsilon_symbol not in first_alpha:
-            return first_alpha.copy()
-
-        select_set = first_alpha - {self.epsilon_symbol}
-        select_set.update(self.follow_sets.get(non_terminal, set()))
-        return select_set
+        SELECT 集合先以终结符位集计算（self._select_masks，供冲突检查做按位与），
+        再还原为字符串集合 self.select_sets。
+        同时构建预测分析表 self._dispatch，解析时按当前 token 类型一次字典查找
+        即可选定产生式，不再逐个扫描 SELECT 集合（集合有交时保留靠前的产生式，
+        与逐个扫描的结果一致；冲突本身由 _check_ll1_conflicts 报告）。
+        """
+        self.select_sets = {}
+        self._select_masks: Dict[str, List[int]] = {}
+        self._dispatch = {}
+        follow = self._follow_masks
+        for j, non_terminal in enumerate(self._nt_names):
+            masks = []
+            select_sets = []
+            table: Dict[str, int] = {}
+            for index, production_ids in enumerate(self._grammar_ids[j]):
+                # SELECT(A -> α) = FIRST(α) - {ε}，若 α 可推导出 ε 则再并上 FOLLOW(A)
+                mask = self._first_mask_of_sequence(production_ids)
+                if mask & 1:
+                    mask = (mask & ~1) | follow[j]
+                masks.append(mask)
+                select_set = self._decode_terminals(mask)
+                select_sets.append(select_set)
+                for token_type in select_set:
+                    table.setdefault(token_type, index)
+            self._select_masks[non_terminal] = masks
+            self.select_sets[non_terminal] = select_sets
+            self._dispatch[non_terminal] = table
 
     def _check_ll1_conflicts(self):
         for A in self.non_terminals:
             productions = self.grammar.get(A, [])
             if len(productions) <= 1: continue
 
-            select_sets = self.select_sets[A]
+            select_masks = self._select_masks[A]
+
+            # 线性预检：各 SELECT 集与此前并集均不相交即无冲突；
+            # 只有确实存在冲突时才逐对比较，以便报告与原先相同的产生式对
+            seen = 0
+            for mask in select_masks:
+                if seen & mask:
+                    break
+                seen |= mask
+            else:
+                continue
 
-            for i in range(len(select_sets)):
-                for j in range(i + 1, len(select_sets)):
-                    set_i = select_sets[i]
-                    set_j = select_sets[j]
-                    intersection = set_i.intersection(set_j)
+            for i in range(len(select_masks)):
+                for j in range(i + 1, len(select_masks)):
+                    overlap = select_masks[i] & select_masks[j]
 
-                    if intersection:
+                    if overlap:
+                        intersection = self._decode_terminals(overlap)
                         prod_i_str = " ".join(productions[i]) if productions[i] else self.epsilon_symbol
                         prod_j_str = " ".join(productions[j]) if productions[j] else self.epsilon_symbol
                         raise ParseError(
@@ -485,6 +633,7 @@ class ParserGenerator:
         self._compute_follow_sets()  # 修正了 FOLLOW 集合的计算
         self._precompute_select_sets()  # 预计算所有产生式的SELECT集合
         self._check_ll1_conflicts()
+        self._compile_actions()  # [SDT] 预先为每个产生式选定翻译动作
         self.analysis_sets_built = True
 
     def _identify_symbols(self):
@@ -496,16 +645,21 @@ class ParserGenerator:
                 for symbol in production:
                     all_symbols.add(symbol)
 
+        # 带引号的终结符 -> token类型（去掉引号），判断终结符与取类型名只需一次字典查找
+        self._token_type_of: Dict[str, str] = {}
+        # token类型名驻留（sys.intern）：词法分析器产生的 token.type 同样是驻留字符串，
+        # 预测分析表查找与 match() 的比较都可以直接按指针命中
         for symbol in all_symbols:
             if symbol.startswith("'") and symbol.endswith("'"):
-                self.terminals.add(symbol[1:-1])
+                token_type = intern(symbol[1:-1])
+                self.terminals.add(token_type)
+                self._token_type_of[symbol] = token_type
             elif symbol not in self.non_terminals:
                 pass
         self.terminals.add('EOF')
 
     def _is_terminal(self, symbol: str) -> bool:
-        if symbol.startswith("'") and symbol.endswith("'"): return True
-        return symbol in self.terminals
+        return symbol in self._token_type_of or symbol in self.terminals
 
     def _can_derive_epsilon(self, non_terminal: str) -> bool:
         return self.epsilon_symbol in self.first_sets.get(non_terminal, set())
@@ -525,21 +679,45 @@ class ParserGenerator:
     def new_temp(self) -> str:
         """生成新的临时变量名"""
         self.temp_counter += 1
-        return f"t{self.temp_counter}"
+        n = self.temp_counter
+        return self._TEMP_NAMES[n - 1] if n <= len(self._TEMP_NAMES) else f"t{n}"
     
     def new_label(self) -> str:
         """生成新的标签名"""
         self.label_counter += 1
-        return f"L{self.label_counter}"
+        n = self.label_counter
+        return self._LABEL_NAMES[n - 1] if n <= len(self._LABEL_NAMES) else f"L{n}"
     
     def emit(self, code: str) -> None:
         """发出一条中间代码指令"""
         if self.enable_sdt:
             self.code_buffer.append(code)
+
+    def emit_many(self, *codes: str) -> None:
+        """一次发出多条中间代码指令（只检查一次 enable_sdt，整批 extend 进缓冲区）"""
+        if self.enable_sdt:
+            self.code_buffer.extend(codes)
     
     def get_generated_code(self) -> str:
         """获取生成的中间代码"""
         return '\n'.join(self.code_buffer)
+
+    def write_generated_code(self, out) -> None:
+        """将生成的中间代码逐行写入文件对象
+
+        参数:
+            out: 任意带 write() 方法的文本输出对象
+
+        说明:
+            写出内容与 get_generated_code() 相同，但不拼接完整字符串，
+            输出到文件时可省去一次全量拷贝与对应的峰值内存。
+        """
+        write = out.write
+        sep = ''
+        for line in self.code_buffer:
+            write(sep)
+            write(line)
+            sep = '\n'
     
     def reset_code_generation(self) -> None:
         """重置代码生成状态（用于新的编译）"""
@@ -547,6 +725,8 @@ class ParserGenerator:
         self.temp_counter = 0
         self.label_counter = 0
         self.symbol_table = {}
+        self._defined_vars_snapshot = None
+        self._suggestion_cache = {}
         self.semantic_errors = []
         self.backpatch_stack = []  # 重置回填栈
     
@@ -570,9 +750,17 @@ class ParserGenerator:
         line = token.line if token else 0
         column = token.column if token else 0
         
-        # 获取所有已定义的变量名
-        defined_vars = set(self.symbol_table.keys())
-        suggestion = suggest_variable_fix(var_name, defined_vars)
+        # 获取所有已定义的变量名（符号表只增不减，变量数不变时沿用上次的集合）
+        defined_vars = self._defined_vars_snapshot
+        if defined_vars is None or len(defined_vars) != len(self.symbol_table):
+            defined_vars = self._defined_vars_snapshot = set(self.symbol_table)
+            self._suggestion_cache = {}
+        # 同一个拼错的变量名往往多次出现，已定义变量不变时直接复用上次的建议
+        if var_name in self._suggestion_cache:
+            suggestion = self._suggestion_cache[var_name]
+        else:
+            suggestion = suggest_variable_fix(var_name, defined_vars) if defined_vars else None
+            self._suggestion_cache[var_name] = suggestion
         
         error_msg = f"语义错误：第 {line} 行，第 {column} 列 - 变量 '{var_name}' 未定义"
         if suggestion:
@@ -599,7 +787,7 @@ class ParserGenerator:
         current = self.current_token()
         if current.type == expected_type:
             self.pos += 1
-            return ASTNode(name=current.type, token=current)
+            return ASTNode(name=current.type, children=_NO_CHILDREN, token=current)
         else:
             raise ParseError(
                 f"Syntax Error at Line {current.line}, Column {current.column}: "
@@ -612,102 +800,116 @@ class ParserGenerator:
         
         [SDT核心] 在识别产生式后立即执行翻译动作：
         - 终结符：直接匹配并返回节点
-        - 非终结符：递归解析子符号，然后根据产生式生成代码
+        - 非终结符：依次解析子符号，然后根据产生式生成代码
         
         [回填技术] 对于控制流语句（if/while），使用回填技术解决代码生成顺序问题：
         - 在解析Condition后，先生成条件跳转代码（占位）
         - 然后解析Stmt（语句体代码会在条件跳转之后生成）
         - 最后回填标签位置
+
+        说明:
+            用显式栈代替递归：每个正在展开的非终结符对应栈中一帧
+            [符号, 产生式, 已完成的子节点, 控制流类型, 退出标签, 循环标签, 翻译动作]。
+            语句序列等右递归结构不再受 Python 递归深度限制，也省去每个符号一次的函数调用。
+            子符号的解析顺序、翻译动作与回填代码的生成顺序与递归下降完全一致。
+
+            不做 packrat 式的 (符号, 位置) 记忆化：LL(1) 预测分析按 SELECT 集合
+            唯一选定产生式、从不回溯，每个 (非终结符, 位置) 至多展开一次，记忆表
+            不会命中；且命中时跳过的翻译动作（emit/new_temp）本身就是需要的副作用。
         """
-        if symbol.startswith("'") and symbol.endswith("'"):
-            token_type = symbol[1:-1]
-            node = self.match(token_type)
-            # [SDT] 终结符的综合属性就是其词法值
-            if node.token:
-                node.synthesized_value = node.token.value
-            return node
-
-        if symbol not in self.grammar:
-            raise ParseError(f"Unknown symbol reference in grammar: {symbol}")
-
-        current_token_type = self.current_token().type
-        productions = self.grammar[symbol]
-        select_sets_for_symbol = self.select_sets[symbol]
-        found_production = None
-        found_index = -1
-
-        for i, select_set in enumerate(select_sets_for_symbol):
-            if current_token_type in select_set:
-                found_production = productions[i]
-                found_index = i
-                break
+        token_type_of = self._token_type_of
+        grammar = self.grammar
+        dispatch = self._dispatch
+        actions = self._actions
+        control_kinds = self._control_kinds
+        # 当前token在循环内直接按下标取，不逐次经过 current_token()/match() 的方法调用
+        tokens = self.tokens
+        token_count = len(tokens)
+        stack = []
+
+        while True:
+            # 1. 展开 symbol：终结符与空产生式直接得到节点，其余非终结符压入新的一帧
+            pos = self.pos
+            current = tokens[pos] if pos < token_count else tokens[-1]
+            token_type = token_type_of.get(symbol)
+            if token_type is not None:
+                if current.type == token_type:
+                    self.pos = pos + 1
+                    node = ASTNode(name=current.type, children=_NO_CHILDREN, token=current)
+                else:
+                    node = self.match(token_type)  # 不匹配：由 match 报告语法错误
+                # [SDT] 终结符的综合属性就是其词法值
+                if node.token:
+                    node.synthesized_value = node.token.value
+            else:
+                if symbol not in grammar:
+                    raise ParseError(f"Unknown symbol reference in grammar: {symbol}")
+
+                # 查预测分析表选定产生式
+                found_index = dispatch[symbol].get(current.type, -1)
+                if found_index < 0:
+                    expected = self.first_sets.get(symbol, set()) - {self.epsilon_symbol}
+                    if self.epsilon_symbol in self.first_sets.get(symbol, set()):
+                        expected.update(self.follow_sets.get(symbol, set()))
+                    raise ParseError(f"Syntax Error: Expected one of {expected}")
+
+                found_production = grammar[symbol][found_index]
+                if not found_production:
+                    # 处理空产生式（epsilon）
+                    node = ASTNode(name=symbol, children=_NO_CHILDREN, token=None, synthesized_value=None)
+                else:
+                    # [回填技术] 控制流语句类型（0: 否, 1: if, 2: while）已在 _compile_actions 中按产生式算好
+                    control = control_kinds[symbol][found_index] if self.enable_sdt else 0
+                    stack.append([symbol, found_production, [], control, None, None,
+                                  actions[symbol][found_index]])
+                    symbol = found_production[0]
+                    continue
 
-        if found_production is not None:
-            children_nodes = []
-            # 处理空产生式（epsilon）
-            if not found_production or (found_production == []):
-                return ASTNode(name=symbol, children=[], token=None, synthesized_value=None)
-            
-            # [回填技术] 检测是否是控制流语句
-            is_if_stmt = 'If' in symbol and len(found_production) >= 5
-            is_while_stmt = 'While' in symbol and len(found_production) >= 5
-            is_control_flow = is_if_stmt or is_while_stmt
-            
-            # 递归解析所有子符号（对控制流语句特殊处理）
-            if is_control_flow and self.enable_sdt:
-                # 解析前4个子符号：keyword lparen condition rparen
-                for i in range(min(4, len(found_production))):
-                    children_nodes.append(self.parse_symbol(found_production[i]))
-                
-                # 获取condition的值
-                condition_val = children_nodes[2].synthesized_value if len(children_nodes) > 2 else None
-                
-                # [回填] 在解析Stmt之前，先生成条件跳转代码
-                exit_label = self.new_label()
-                loop_label = None
-                
-                if is_while_stmt:
-                    loop_label = self.new_label()
-                    self.emit(f"{loop_label}:")
-                
-                if condition_val:
-                    temp = self.new_temp()
-                    self.emit(f"{temp} = not {condition_val}")
-                    self.emit(f"if {temp} goto {exit_label}")
-                
-                # 现在解析Stmt（第5个子符号），代码会生成在条件跳转之后
-                if len(found_production) > 4:
-                    children_nodes.append(self.parse_symbol(found_production[4]))
-                
-                # 解析剩余子符号
-                for i in range(5, len(found_production)):
-                    children_nodes.append(self.parse_symbol(found_production[i]))
-                
-                # [回填] 添加退出标签
-                if is_while_stmt and loop_label:
-                    self.emit(f"goto {loop_label}")
-                self.emit(f"{exit_label}:")
-                
+            # 2. 把完成的节点交给栈顶帧；若该帧的子符号已全部解析，则生成该帧的节点继续向上
+            while stack:
+                frame = stack[-1]
+                production = frame[1]
+                children_nodes = frame[2]
+                children_nodes.append(node)
+                done = len(children_nodes)
+
+                if frame[3] and done == 4:
+                    # [回填] 已解析 keyword lparen condition rparen，在解析Stmt之前先生成条件跳转代码
+                    condition_val = children_nodes[2].synthesized_value
+                    exit_label = frame[4] = self.new_label()
+                    if frame[3] == 2:
+                        loop_label = frame[5] = self.new_label()
+                        self.emit(f"{loop_label}:")
+                    if condition_val:
+                        temp = self.new_temp()
+                        self.emit_many(f"{temp} = not {condition_val}",
+                                       f"if {temp} goto {exit_label}")
+
+                if done < len(production):
+                    symbol = production[done]
+                    break
+
+                stack.pop()
+                symbol = frame[0]
                 node = ASTNode(name=symbol, children=children_nodes)
-                # 控制流语句的SDT已经在上面处理，不需要再调用_apply_translation_scheme
-                return node
+                if frame[3]:
+                    # [回填] 添加退出标签；控制流语句的SDT已经在上面处理，不需要再执行翻译动作
+                    if frame[3] == 2:
+                        self.emit_many(f"goto {frame[5]}", f"{frame[4]}:")
+                    else:
+                        self.emit(f"{frame[4]}:")
+                    if not self.retain_ast and self._releasable[symbol]:
+                        node.children = _NO_CHILDREN
+                elif self.enable_sdt:
+                    # [SDT] *** 关键：识别产生式后立即执行翻译动作 ***
+                    action = frame[6]
+                    if action is not None:
+                        action(node)
+                    # 综合属性已经上传，不再被读取的子树可以交给GC回收
+                    if not self.retain_ast and self._releasable[symbol]:
+                        node.children = _NO_CHILDREN
             else:
-                # 非控制流语句：正常递归解析
-                for sym in found_production:
-                    children_nodes.append(self.parse_symbol(sym))
-            
-            node = ASTNode(name=symbol, children=children_nodes)
-            
-            # [SDT] *** 关键：识别产生式后立即执行翻译动作 ***
-            if self.enable_sdt:
-                self._apply_translation_scheme(symbol, found_production, node)
-            
-            return node
-        else:
-            expected = self.first_sets.get(symbol, set()) - {self.epsilon_symbol}
-            if self.epsilon_symbol in self.first_sets.get(symbol, set()):
-                expected.update(self.follow_sets.get(symbol, set()))
-            raise ParseError(f"Syntax Error: Expected one of {expected}")
+                return node
     
     def _is_identifier_token_in_production(self, prod_symbol: str) -> bool:
         """判断产生式中的符号是否是标识符token（消除硬编码）
@@ -859,47 +1061,81 @@ class ParserGenerator:
             LL(1)已经通过FIRST/FOLLOW集选择了正确的产生式。
             这里使用属性文法思想：通过产生式结构识别语义模式，通过属性传递识别操作符类型。
             不依赖非终结符名称，不硬编码token类型列表，提高可扩展性。
+            parse_symbol 直接使用 _compile_actions 预先选好的动作，不经过这里的模式匹配。
+        """
+        action = self._select_translation_action(production)
+        if action is not None:
+            action(node)
+
+    def _compile_actions(self):
+        """[SDT] 为每个产生式预先选定翻译动作
+
+        说明:
+            翻译动作只取决于产生式结构和词法规则得到的token分类，二者在文法分析
+            完成后都不再变化，因此模式匹配只需对每个产生式做一次。
+            self._actions[非终结符][产生式下标] 为动作方法，None 表示结构性节点。
+        """
+        self._actions: Dict[str, List[Optional[Callable[[ASTNode], None]]]] = {
+            symbol: [self._select_translation_action(production) for production in productions]
+            for symbol, productions in self.grammar.items()
+        }
+        # [回填技术] 控制流类型（0: 否, 1: if, 2: while）同样只取决于产生式，一并预先算好
+        self._control_kinds: Dict[str, List[int]] = {
+            symbol: [self._control_kind(symbol, production) for production in productions]
+            for symbol, productions in self.grammar.items()
+        }
+
+        # 尾部处理动作会沿尾部链读取孙辈及更深的节点（_process_tail / collect_ids_from_tail
+        # 读取第 0、2 个子节点的子节点），这些符号的子节点要保留到祖先的动作执行完
+        walked: Set[str] = set()
+        pending = []
+        for symbol, productions in self.grammar.items():
+            for production, action in zip(productions, self._actions[symbol]):
+                if len(production) > 1 and (action == self._sdt_tail or action == self._sdt_var_decl):
+                    pending.append(production[1])
+        while pending:
+            symbol = pending.pop()
+            if symbol in walked or symbol not in self.grammar:
+                continue
+            walked.add(symbol)
+            for production in self.grammar[symbol]:
+                pending.extend(production[pos] for pos in (0, 2) if pos < len(production))
+        # retain_ast 为 False 时，可在自身翻译动作之后立即释放子节点的非终结符
+        self._releasable: Dict[str, bool] = {symbol: symbol not in walked for symbol in self.grammar}
+
+    @staticmethod
+    def _control_kind(symbol: str, production: List[str]) -> int:
+        """[回填技术] 判断产生式是否是控制流语句（0: 否, 1: if, 2: while）"""
+        if len(production) >= 5:
+            if 'While' in symbol:
+                return 2
+            if 'If' in symbol:
+                return 1
+        return 0
+
+    def _select_translation_action(self, production: List[str]) -> Optional[Callable[[ASTNode], None]]:
+        """按产生式结构选择翻译动作（模式按优先级依次匹配）
+
+        返回:
+            绑定的动作方法，不需要生成代码的结构性产生式返回 None
         """
-        children = node.children
-        
         # ====================================================================
         # 1. 表达式和算术运算（直接检查产生式内容）
         # ====================================================================
         
         # 单个终结符产生式：通过token对象的type属性识别，而不是硬编码字符串
         if len(production) == 1 and production[0].startswith("'"):
-            # 获取token对象（从属性中获取，不硬编码）
-            token = children[0].token if children[0].token else None
-            value = children[0].synthesized_value
-            
-            # 通过token.type属性识别标识符（从token对象获取，不是硬编码字符串）
-            # 只有标识符类型才需要检查变量定义（修复：不检查操作符、关键字、标点）
-            if token and hasattr(token, 'type') and self.enable_variable_check:
-                # 消除硬编码：只检查标识符类型的token
-                if token.type in self.identifier_tokens:
-                    if value and value not in self.symbol_table:
-                        self.check_variable_defined(value, token)
-            
-            node.synthesized_value = value
+            return self._sdt_single_terminal
         
-        # 表达式尾部（处理加减法）：通过结构识别（第一个是表达式，第二个是尾部）
-        # 尾部可能是：操作符 + 操作数 + 尾部，或单个操作节点
+        # 表达式/项尾部（处理加减法与乘除法）：通过结构识别（第一个是操作数，第二个是尾部）
+        # 尾部可能是：操作符 + 操作数 + 尾部，或单个操作节点；运算符取自尾部中的token，
+        # 因此加减与乘除由同一个动作处理
         elif len(production) == 2 and not production[0].startswith("'") and not production[1].startswith("'"):
-            # 检查第二个符号是否是尾部（通过检查其子节点结构）
-            left_val = children[0].synthesized_value
-            tail_val = self._process_expr_tail(children[1], left_val)
-            node.synthesized_value = tail_val
-        
-        # 项尾部（处理乘除法）：通过结构识别
-        elif len(production) == 2 and not production[0].startswith("'") and not production[1].startswith("'"):
-            # 如果第一个处理失败，尝试作为项尾部处理
-            left_val = children[0].synthesized_value
-            tail_val = self._process_term_tail(children[1], left_val)
-            node.synthesized_value = tail_val
+            return self._sdt_tail
         
         # 单个子节点（传递值）- 通用情况
         elif len(production) == 1:
-            node.synthesized_value = children[0].synthesized_value
+            return self._sdt_pass_through
         
         # 括号表达式：left_paren Expr right_paren（消除硬编码）
         # 模式：第一个是左括号token，第二个是非终结符，第三个是右括号token
@@ -907,7 +1143,7 @@ class ParserGenerator:
               self._is_left_paren_token_in_production(production[0]) and 
               not production[1].startswith("'") and 
               self._is_right_paren_token_in_production(production[2])):
-            node.synthesized_value = children[1].synthesized_value
+            return self._sdt_paren
         
         # ====================================================================
         # 2. 语句处理（消除硬编码，通过词法规则动态识别）
@@ -918,17 +1154,7 @@ class ParserGenerator:
         elif (len(production) >= 3 and 
               self._is_identifier_token_in_production(production[0]) and 
               self._is_operator_token_in_production(production[1])):
-            var_name = children[0].synthesized_value
-            expr_val = children[2].synthesized_value
-            if var_name:
-                # [语义检查] 根据语言类型决定是否检查变量声明
-                if var_name not in self.symbol_table:
-                    if self.requires_explicit_declaration:
-                        token = children[0].token if children[0].token else None
-                        self.check_variable_defined(var_name, token)
-                    self.symbol_table[var_name] = {'type': 'var'}
-                if expr_val:
-                    self.emit(f"{var_name} = {expr_val}")
+            return self._sdt_assign
         
         # 输出语句：通过产生式结构识别（关键字 'LPAREN' Expr 'RPAREN'模式）
         # 模式：第一个是关键字（终结符），第二个是'LPAREN'，第三个是表达式（非终结符）
@@ -937,21 +1163,15 @@ class ParserGenerator:
             # 通过产生式结构识别：如果是关键字结构，则处理输出语句
             if (self._is_keyword_token_in_production(production[0]) and 
                 self._is_punctuation_token_in_production(production[1])):  # LPAREN等
-                expr_val = children[2].synthesized_value
-                if expr_val:
-                    self.emit(f"param {expr_val}")
-                    self.emit(f"call write, 1")
+                return self._sdt_write
+            return None
         
         # 输入语句：keyword_token identifier_token ...
         # 通过结构识别：第一个是关键字，第二个是标识符（消除硬编码）
         elif (len(production) >= 2 and 
               self._is_keyword_token_in_production(production[0]) and 
               self._is_identifier_token_in_production(production[1])):
-            var_name = children[1].synthesized_value
-            if var_name:
-                temp = self.new_temp()
-                self.emit(f"{temp} = call read, 0")
-                self.emit(f"{var_name} = {temp}")
+            return self._sdt_read
         
         # ====================================================================
         # 3. 控制流语句（已在parse_symbol中使用回填技术处理）
@@ -959,7 +1179,6 @@ class ParserGenerator:
         
         # 控制流语句：if/while已经在parse_symbol中使用回填技术处理
         # 这里不需要再处理（避免重复生成代码）
-        # 注释掉原来的处理逻辑
         
         # 布尔表达式/Condition：通过产生式结构识别（Expr Op Expr模式或Expr RelOp Expr模式）
         # 模式：第一个是表达式（非终结符），第二个是操作符（非终结符或终结符），第三个是表达式（非终结符）
@@ -970,30 +1189,18 @@ class ParserGenerator:
             if production[1].startswith("'"):
                 # 第二个是终结符：Expr Op Expr
                 if self._is_binary_operator_by_structure(production, 1):
-                    op_node = children[1]
-                    if op_node.token:
-                        e1 = children[0].synthesized_value
-                        op_val = op_node.synthesized_value
-                        e2 = children[2].synthesized_value
-                        if e1 and op_val and e2:
-                            temp = self._apply_binary_op(op_val, e1, e2)
-                            node.synthesized_value = temp
-            else:
-                # 第二个是非终结符：Expr RelOp Expr（Condition产生式）
-                e1 = children[0].synthesized_value
-                relop_val = children[1].synthesized_value  # RelOp的值
-                e2 = children[2].synthesized_value
-                if e1 and relop_val and e2:
-                    temp = self.new_temp()
-                    self.emit(f"{temp} = {e1} {relop_val} {e2}")
-                    node.synthesized_value = temp
+                    return self._sdt_binary_op
+                return None
+            # 第二个是非终结符：Expr RelOp Expr（Condition产生式）
+            return self._sdt_relation
         
         # 关系运算符（单个token）：通过结构识别（单个终结符）
         # 模式：单个终结符，且是操作符token（消除硬编码排除列表）
         elif len(production) == 1 and production[0].startswith("'"):
             # 消除硬编码：通过词法规则动态识别操作符
             if self._is_operator_token_in_production(production[0]):
-                node.synthesized_value = children[0].synthesized_value
+                return self._sdt_pass_through
+            return None
         
         # ====================================================================
         # 4. 变量声明列表（消除硬编码，通过词法规则动态识别）
@@ -1002,205 +1209,228 @@ class ParserGenerator:
         elif (len(production) >= 2 and 
               self._is_identifier_token_in_production(production[0]) and 
               not production[1].startswith("'")):
-            # 收集所有声明的变量并添加到符号表
-            # 模式：identifier_token Tail，其中Tail可能是 punctuation_token identifier_token Tail | ε
-            def collect_ids_from_tail(tail_node):
-                """递归收集尾部的所有变量名（消除硬编码，通过词法规则动态识别）"""
-                var_names = []
-                if not tail_node or not tail_node.children:
-                    return var_names
-                
-                # 检查是否是 punctuation_token identifier_token ... 模式
-                if len(tail_node.children) >= 2:
-                    comma_node = tail_node.children[0]
-                    id_node = tail_node.children[1]
-                    # 通过词法规则判断，而不是硬编码token类型名称
-                    if comma_node.token and comma_node.token.type in self.punctuation_tokens:
-                        if id_node.token and id_node.token.type in self.identifier_tokens:
-                            var_name = id_node.synthesized_value
-                            if var_name:
-                                var_names.append(var_name)
-                                self.symbol_table[var_name] = {'type': 'var'}
-                        
-                        # 递归处理剩余的尾部
-                        if len(tail_node.children) > 2:
-                            next_tail = tail_node.children[2]
-                            var_names.extend(collect_ids_from_tail(next_tail))
-                
-                return var_names
-            
-            # 处理第一个identifier（消除硬编码，通过词法规则动态识别）
-            if children[0].token and children[0].token.type in self.identifier_tokens:
-                var_name = children[0].synthesized_value
-                if var_name:
-                    self.symbol_table[var_name] = {'type': 'var'}
-            
-            # 处理尾部中的所有ID
-            if len(children) > 1:
-                tail = children[1]
-                collect_ids_from_tail(tail)
+            return self._sdt_var_decl
         
         # ====================================================================
         # 5. 其他情况（不匹配任何已知模式的结构性节点，不生成代码）
         # ====================================================================
         # 如果产生式不匹配任何已知的代码生成模式，则跳过（结构性节点）
-    
-    def _process_expr_tail(self, tail_node: ASTNode, left_val: str) -> str:
-        """处理表达式尾部（加减法）- SDT辅助方法
-        
-        支持两种文法格式：
-        1. simple_expr: Expr_LF_TAIL_X -> AddOp
-        2. PL/0: ExprTail -> 'PLUS'/'MINUS' Term ExprTail
-        """
-        if not tail_node or not tail_node.children:
-            return left_val
-        
-        children = tail_node.children
-        
-        # 格式1: 单个子节点，且是操作节点（通过结构识别：操作符 + 操作数）
-        # 模式：单个子节点，且该子节点有至少2个子节点（操作符 + 操作数）
-        if len(children) == 1 and children[0].children:
-            if len(children[0].children) >= 2:
-                first_child = children[0].children[0]
-                if first_child.token:
-                    op_type = first_child.token.type
-                    # 消除硬编码：通过词法规则动态识别操作符
-                    if op_type in self.operator_tokens:
-                        return self._process_add_op(children[0], left_val)
-        
-        # 格式2: 直接包含操作符的结构（未优化的文法）
-        # 通过结构识别：第一个是操作符token，第二个是操作数（消除硬编码）
-        if children and children[0].token and len(children) >= 2:
-            op_type = children[0].token.type
-            # 消除硬编码：通过词法规则动态识别操作符
-            if op_type in self.operator_tokens:
-                op = children[0].synthesized_value
-                right_val = children[1].synthesized_value if len(children) > 1 else None
-                if op and right_val:
-                    temp = self.new_temp()
-                    self.emit(f"{temp} = {left_val} {op} {right_val}")
-                    # 递归处理剩余的ExprTail
-                    if len(children) > 2 and children[2].children:
-                        return self._process_expr_tail(children[2], temp)
-                    return temp
-        
-        return left_val
-    
-    def _process_add_op(self, add_op_node: ASTNode, left_val: str) -> str:
-        """处理AddOp节点
-        
-        AddOp结构: AddOp -> 'PLUS'/'MINUS' Term AddOp_LF_TAIL_X
+        return None
+
+    # ------------------------------------------------------------------------
+    # [SDT] 翻译动作：由 _select_translation_action 按产生式结构选定
+    # ------------------------------------------------------------------------
+
+    def _sdt_single_terminal(self, node: ASTNode) -> None:
+        """单个终结符：传递词法值，标识符需检查是否已定义"""
+        child = node.children[0]
+        # 获取token对象（从属性中获取，不硬编码）
+        token = child.token if child.token else None
+        value = child.synthesized_value
+        
+        # 通过token.type属性识别标识符（从token对象获取，不是硬编码字符串）
+        # 只有标识符类型才需要检查变量定义（修复：不检查操作符、关键字、标点）
+        if token and hasattr(token, 'type') and self.enable_variable_check:
+            # 消除硬编码：只检查标识符类型的token
+            if token.type in self.identifier_tokens:
+                if value and value not in self.symbol_table:
+                    self.check_variable_defined(value, token)
+        
+        node.synthesized_value = value
+
+    def _sdt_tail(self, node: ASTNode) -> None:
+        """操作数 + 尾部：把左操作数沿尾部（加减法或乘除法）向下传递"""
+        children = node.children
+        # 检查第二个符号是否是尾部（通过检查其子节点结构）
+        left_val = children[0].synthesized_value
+        node.synthesized_value = self._process_tail(children[1], left_val)
+
+    def _sdt_pass_through(self, node: ASTNode) -> None:
+        """单个子节点：传递综合属性"""
+        node.synthesized_value = node.children[0].synthesized_value
+
+    def _sdt_paren(self, node: ASTNode) -> None:
+        """括号表达式：取括号内表达式的值"""
+        node.synthesized_value = node.children[1].synthesized_value
+
+    def _sdt_assign(self, node: ASTNode) -> None:
+        """赋值语句：登记变量并生成赋值指令"""
+        children = node.children
+        var_name = children[0].synthesized_value
+        expr_val = children[2].synthesized_value
+        if var_name:
+            # [语义检查] 根据语言类型决定是否检查变量声明
+            if var_name not in self.symbol_table:
+                if self.requires_explicit_declaration:
+                    token = children[0].token if children[0].token else None
+                    self.check_variable_defined(var_name, token)
+                self.symbol_table[var_name] = _VAR_ENTRY
+            if expr_val:
+                self.emit(f"{var_name} = {expr_val}")
+
+    def _sdt_write(self, node: ASTNode) -> None:
+        """输出语句：生成 write 调用"""
+        expr_val = node.children[2].synthesized_value
+        if expr_val:
+            self.emit_many(f"param {expr_val}", "call write, 1")
+
+    def _sdt_read(self, node: ASTNode) -> None:
+        """输入语句：生成 read 调用并赋值"""
+        var_name = node.children[1].synthesized_value
+        if var_name:
+            temp = self.new_temp()
+            self.emit_many(f"{temp} = call read, 0", f"{var_name} = {temp}")
+
+    def _sdt_binary_op(self, node: ASTNode) -> None:
+        """Expr Op Expr（操作符为终结符）：生成二元运算"""
+        children = node.children
+        op_node = children[1]
+        if op_node.token:
+            e1 = children[0].synthesized_value
+            op_val = op_node.synthesized_value
+            e2 = children[2].synthesized_value
+            if e1 and op_val and e2:
+                node.synthesized_value = self._apply_binary_op(op_val, e1, e2)
+
+    def _sdt_relation(self, node: ASTNode) -> None:
+        """Expr RelOp Expr（Condition产生式）：生成关系运算"""
+        children = node.children
+        e1 = children[0].synthesized_value
+        relop_val = children[1].synthesized_value  # RelOp的值
+        e2 = children[2].synthesized_value
+        if e1 and relop_val and e2:
+            temp = self.new_temp()
+            self.emit(f"{temp} = {e1} {relop_val} {e2}")
+            node.synthesized_value = temp
+
+    def _sdt_var_decl(self, node: ASTNode) -> None:
+        """变量声明列表：把声明的变量全部登记到符号表"""
+        # dict.fromkeys 在 C 层批量建表，update 一次合并，不为每个变量名构造 (键, 值) 元组
+        self.symbol_table.update(dict.fromkeys(self._iter_declared_ids(node.children), _VAR_ENTRY))
+
+    def _iter_declared_ids(self, children: List[ASTNode]):
+        """依次产生变量声明列表中声明的变量名（消除硬编码，通过词法规则动态识别）
+
+        模式：identifier_token Tail，其中Tail可能是 punctuation_token identifier_token Tail | ε；
+        沿尾部链循环向下，不为每个逗号递归一层。
         """
-        if not add_op_node or not add_op_node.children:
-            return left_val
-        
-        children = add_op_node.children
-        # DEBUG: print(f"[SDT] _process_add_op: children={[c.name for c in children]}, left={left_val}")
-        
-        if len(children) >= 2:
-            # children[0]是操作符，children[1]是操作数，children[2]可能是递归尾部
-            # 消除硬编码：通过词法规则动态识别操作符
-            if children[0].token:
-                op_type = children[0].token.type
-                # 消除硬编码：通过词法规则识别操作符token
-                if op_type in self.operator_tokens:
-                    op = children[0].synthesized_value
-                    right_val = children[1].synthesized_value
-                    if op and right_val:
-                        temp = self.new_temp()
-                        self.emit(f"{temp} = {left_val} {op} {right_val}")
-                        # 检查是否还有递归的操作节点（通过结构识别）
-                        if len(children) > 2:
-                            tail = children[2]
-                            if tail.children and len(tail.children) == 1:
-                                tail_child = tail.children[0]
-                                # 检查是否是操作节点结构（操作符 + 操作数）
-                                if tail_child.children and len(tail_child.children) >= 2:
-                                    if tail_child.children[0].token:
-                                        tail_op_type = tail_child.children[0].token.type
-                                        if tail_op_type in self.operator_tokens:
-                                            return self._process_add_op(tail_child, temp)
-                        return temp
-        return left_val
+        # 第一个identifier
+        if children[0].token and children[0].token.type in self.identifier_tokens:
+            var_name = children[0].synthesized_value
+            if var_name:
+                yield var_name
+        
+        # 尾部中的所有ID
+        tail_node = children[1] if len(children) > 1 else None
+        while tail_node and len(tail_node.children) >= 2:
+            tail_children = tail_node.children
+            comma_node = tail_children[0]
+            # 通过词法规则判断，而不是硬编码token类型名称
+            if not (comma_node.token and comma_node.token.type in self.punctuation_tokens):
+                break
+            id_node = tail_children[1]
+            if id_node.token and id_node.token.type in self.identifier_tokens:
+                var_name = id_node.synthesized_value
+                if var_name:
+                    yield var_name
+            tail_node = tail_children[2] if len(tail_children) > 2 else None
     
-    def _process_term_tail(self, tail_node: ASTNode, left_val: str) -> str:
-        """处理项尾部（乘除法）- SDT辅助方法（消除硬编码）
+    def _process_tail(self, tail_node: ASTNode, left_val: str) -> str:
+        """处理表达式/项尾部（加减法、乘除法）- SDT辅助方法
         
         支持两种文法格式：
-        1. simple_expr: Term_LF_TAIL_X -> MulOp
-        2. PL/0: TermTail -> operator_token Factor TermTail
+        1. simple_expr: Expr_LF_TAIL_X -> AddOp, Term_LF_TAIL_X -> MulOp
+        2. PL/0: ExprTail -> 'PLUS'/'MINUS' Term ExprTail, TermTail -> 'MUL'/'DIV' Factor TermTail
+
+        说明:
+            格式2 沿尾部链循环处理，每个运算符生成一条指令，左操作数换成新的临时变量，
+            长运算链不会逐项加深调用栈。整条链的指令先收集在局部列表中，最后一次 emit_many。
         """
-        if not tail_node or not tail_node.children:
-            return left_val
-        
-        children = tail_node.children
-        
-        # 格式1: 单个子节点，且是操作节点（通过结构识别，消除硬编码）
-        # 模式：单个子节点，且该子节点有至少2个子节点（操作符 + 操作数）
-        if len(children) == 1 and children[0].children:
-            if len(children[0].children) >= 2:
-                first_child = children[0].children[0]
-                if first_child.token:
-                    op_type = first_child.token.type
+        operator_tokens = self.operator_tokens
+        lines = []
+        while tail_node and tail_node.children:
+            children = tail_node.children
+            
+            # 格式1: 单个子节点，且是操作节点（通过结构识别：操作符 + 操作数）
+            # 模式：单个子节点，且该子节点有至少2个子节点（操作符 + 操作数）
+            # 操作符位置上几乎总是终结符节点，token 为 None 的情况少见，按 EAFP 直接取 .type
+            first = children[0]
+            if len(children) == 1:
+                grandchildren = first.children
+                if len(grandchildren) >= 2:
+                    try:
+                        op_type = grandchildren[0].token.type
+                    except AttributeError:
+                        break
                     # 消除硬编码：通过词法规则动态识别操作符
-                    if op_type in self.operator_tokens:
-                        return self._process_mul_op(children[0], left_val)
-        
-        # 格式2: 直接包含操作符的结构（未优化的文法，消除硬编码）
-        # 通过结构识别：第一个是操作符token，第二个是操作数
-        if children and children[0].token and len(children) >= 2:
-            op_type = children[0].token.type
-            # 消除硬编码：通过词法规则动态识别操作符
-            if op_type in self.operator_tokens:
-                op = children[0].synthesized_value
-                right_val = children[1].synthesized_value if len(children) > 1 else None
-                if op and right_val:
-                    temp = self.new_temp()
-                    self.emit(f"{temp} = {left_val} {op} {right_val}")
-                    # 递归处理剩余的TermTail
-                    if len(children) > 2 and children[2].children:
-                        return self._process_term_tail(children[2], temp)
-                    return temp
+                    if op_type in operator_tokens:
+                        self.emit_many(*lines)
+                        return self._process_op_node(first, left_val)
+                break
+            
+            # 格式2: 直接包含操作符的结构（未优化的文法）
+            # 通过结构识别：第一个是操作符token，第二个是操作数（消除硬编码）
+            try:
+                op_type = first.token.type
+            except AttributeError:
+                break
+            if op_type not in operator_tokens:
+                break
+            op = first.synthesized_value
+            right_val = children[1].synthesized_value
+            if not (op and right_val):
+                break
+            temp = self.new_temp()
+            lines.append(f"{temp} = {left_val} {op} {right_val}")
+            left_val = temp
+            # 继续处理剩余的尾部
+            if len(children) <= 2:
+                break
+            tail_node = children[2]
         
+        self.emit_many(*lines)
         return left_val
     
-    def _process_mul_op(self, mul_op_node: ASTNode, left_val: str) -> str:
-        """处理MulOp节点（消除硬编码）
+    def _process_op_node(self, op_node: ASTNode, left_val: str) -> str:
+        """处理操作节点（AddOp/MulOp）
         
-        MulOp结构: MulOp -> operator_token Factor MulOp_LF_TAIL_X
+        结构: AddOp -> 'PLUS'/'MINUS' Term AddOp_LF_TAIL_X
+              MulOp -> 'MUL'/'DIV' Factor MulOp_LF_TAIL_X
+
+        说明:
+            children[0]是操作符，children[1]是操作数，children[2]可能是递归尾部；
+            尾部若只含一个操作节点，则循环处理该节点，而不是递归调用；
+            整条链的指令先收集在局部列表中，最后一次 emit_many。
         """
-        if not mul_op_node or not mul_op_node.children:
-            return left_val
-        
-        children = mul_op_node.children
-        # DEBUG: print(f"[SDT] _process_mul_op: children={[c.name for c in children]}, left={left_val}")
-        
-        if len(children) >= 2:
-            # children[0]是操作符，children[1]是操作数，children[2]可能是递归尾部
-            # 消除硬编码：通过词法规则动态识别操作符
-            if children[0].token:
-                op_type = children[0].token.type
-                # 消除硬编码：通过词法规则识别操作符token
-                if op_type in self.operator_tokens:
-                    op = children[0].synthesized_value
-                    right_val = children[1].synthesized_value
-                    if op and right_val:
-                        temp = self.new_temp()
-                        self.emit(f"{temp} = {left_val} {op} {right_val}")
-                        # 检查是否还有递归的操作节点（通过结构识别）
-                        if len(children) > 2:
-                            tail = children[2]
-                            if tail.children and len(tail.children) == 1:
-                                tail_child = tail.children[0]
-                                # 检查是否是操作节点结构（操作符 + 操作数）
-                                if tail_child.children and len(tail_child.children) >= 2:
-                                    if tail_child.children[0].token:
-                                        tail_op_type = tail_child.children[0].token.type
-                                        if tail_op_type in self.operator_tokens:
-                                            return self._process_mul_op(tail_child, temp)
-                        return temp
+        operator_tokens = self.operator_tokens
+        lines = []
+        while op_node and len(op_node.children) >= 2:
+            children = op_node.children
+            first = children[0]
+            try:
+                op_type = first.token.type
+            except AttributeError:  # 第一个子节点不是终结符
+                break
+            # 消除硬编码：通过词法规则识别操作符token
+            if op_type not in operator_tokens:
+                break
+            op = first.synthesized_value
+            right_val = children[1].synthesized_value
+            if not (op and right_val):
+                break
+            temp = self.new_temp()
+            lines.append(f"{temp} = {left_val} {op} {right_val}")
+            left_val = temp
+            # 检查是否还有递归的操作节点（通过结构识别）
+            if len(children) <= 2:
+                break
+            tail_children = children[2].children
+            if len(tail_children) != 1:
+                break
+            op_node = tail_children[0]
+        self.emit_many(*lines)
         return left_val
-
+    
     def parse(self, tokens: List[Token]) -> ASTNode:
         """解析tokens并生成AST
         
@@ -1249,6 +1479,15 @@ def create_parser_from_spec(grammar, start, lexer_rules: List[Tuple[str, str]] =
     return p
 
 
+def _serialize_symbol_sets(sets: Dict[str, Set[str]]) -> str:
+    """把 {非终结符: 符号集合} 序列化为生成代码中的字典字面量（集合元素排序输出）"""
+    parts = ["{\n"]
+    for nt, symbol_set in sets.items():
+        parts.append(f"            '{nt}': {{{', '.join(map(repr, sorted(symbol_set)))}}},\n")
+    parts.append("        }")
+    return "".join(parts)
+
+
 def generate_parser_code(grammar: Dict[str, List[List[str]]], start_symbol: str, 
                         first_sets: Dict[str, Set[str]] = None, 
                         follow_sets: Dict[str, Set[str]] = None,
@@ -1269,41 +1508,31 @@ def generate_parser_code(grammar: Dict[str, List[List[str]]], start_symbol: str,
     返回:
         包含完整语法分析器的Python代码字符串（支持SDT，消除硬编码）
     """
-    # 序列化文法
-    grammar_dict_str = "{\n"
+    # 序列化文法（各片段先收集到列表，最后一次拼接，避免 += 反复复制整个字符串）
+    parts = ["{\n"]
     for non_terminal, productions in grammar.items():
         # 对产生式按长度降序排序，避免短匹配问题
-        sorted_productions = sorted(productions, key=lambda x: len(x), reverse=True)
-        grammar_dict_str += f"            '{non_terminal}': [\n"
+        sorted_productions = sorted(productions, key=len, reverse=True)
+        parts.append(f"            '{non_terminal}': [\n")
         for production in sorted_productions:
             # 使用repr()确保正确转义引号
-            prod_str = ", ".join([repr(sym) for sym in production])
-            grammar_dict_str += f"                [{prod_str}],\n"
-        grammar_dict_str += "            ],\n"
-    grammar_dict_str += "        }"
+            parts.append(f"                [{', '.join(map(repr, production))}],\n")
+        parts.append("            ],\n")
+    parts.append("        }")
+    grammar_dict_str = "".join(parts)
     
     # 序列化FIRST和FOLLOW集合
-    first_sets = first_sets or {}
-    follow_sets = follow_sets or {}
-    first_sets_str = "{\n"
-    for nt, first_set in first_sets.items():
-        first_list = sorted(list(first_set))
-        first_sets_str += f"            '{nt}': {{" + ", ".join([repr(t) for t in first_list]) + "},\n"
-    first_sets_str += "        }"
-    
-    follow_sets_str = "{\n"
-    for nt, follow_set in follow_sets.items():
-        follow_list = sorted(list(follow_set))
-        follow_sets_str += f"            '{nt}': {{" + ", ".join([repr(t) for t in follow_list]) + "},\n"
-    follow_sets_str += "        }"
+    first_sets_str = _serialize_symbol_sets(first_sets or {})
+    follow_sets_str = _serialize_symbol_sets(follow_sets or {})
     
     # 序列化词法规则（用于消除硬编码）
-    lexer_rules_str = "[\n"
+    parts = ["[\n"]
     if lexer_rules:
         for token_type, pattern in lexer_rules:
             escaped_pattern = pattern.replace("'", "\\'")
-            lexer_rules_str += f"            ('{token_type}', r'{escaped_pattern}'),\n"
-    lexer_rules_str += "        ]"
+            parts.append(f"            ('{token_type}', r'{escaped_pattern}'),\n")
+    parts.append("        ]")
+    lexer_rules_str = "".join(parts)
     
     # 从元数据中获取语言特性配置
     require_explicit = False
@@ -1316,28 +1545,54 @@ def generate_parser_code(grammar: Dict[str, List[List[str]]], start_symbol: str,
 # 在解析过程中同时生成中间代码（语法制导翻译）
 # =============================================================================
 
-from dataclasses import dataclass, field
+from itertools import islice
+from sys import intern
 from typing import List, Optional, Set
 
-@dataclass
+# 符号表中普通变量的条目；所有变量共用同一个字典，只读不改
+_VAR_ENTRY = {{'type': 'var'}}
+
+# 预先生成的临时变量名/标签名（t1..t1024, L1..L1024），编号超出时才现场格式化
+_TEMP_NAMES = tuple(f"t{{i}}" for i in range(1, 1025))
+_LABEL_NAMES = tuple(f"L{{i}}" for i in range(1, 1025))
+
 class ASTNode:
-    """AST节点 [SDT扩展]"""
-    name: str
-    children: List['ASTNode'] = field(default_factory=list)
-    token: Optional[object] = None
-    synthesized_value: str = None  # SDT: 综合属性
+    """AST节点 [SDT扩展]
+
+    使用 __slots__ 去掉实例 __dict__；没有子节点时共用空元组，
+    叶子节点不再各自分配一个空列表。
+    """
+    __slots__ = ('name', 'children', 'token', 'synthesized_value')
+
+    def __init__(self, name: str, children: List['ASTNode'] = None,
+                 token: Optional[object] = None, synthesized_value: str = None):
+        self.name = name
+        self.children = children if children is not None else ()
+        self.token = token
+        self.synthesized_value = synthesized_value  # SDT: 综合属性
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.name, tuple(self.children), self.token, self.synthesized_value) == \
+            (other.name, tuple(other.children), other.token, other.synthesized_value)
     
     def __repr__(self, indent=0):
-        prefix = "  " * indent
-        result = f"{{prefix}}{{self.name}}"
-        if self.token:
-            result += f" ('{{self.token.value}}')"
-        if self.synthesized_value:
-            result += f" [val={{self.synthesized_value}}]"
-        result += "\\n"
-        for child in self.children:
-            result += child.__repr__(indent + 1)
-        return result
+        # 显式栈 + 列表拼接：避免逐层 += 带来的 O(N^2) 复制与深树递归
+        out = []
+        stack = [(self, indent)]
+        while stack:
+            node, depth = stack.pop()
+            out.append("  " * depth)
+            out.append(node.name)
+            if node.token:
+                out.append(f" ('{{node.token.value}}')")
+            if node.synthesized_value:
+                out.append(f" [val={{node.synthesized_value}}]")
+            out.append("\\n")
+            for child in reversed(node.children):
+                stack.append((child, depth + 1))
+        return "".join(out)
 
 class GeneratedParser:
     """自动生成的语法分析器 [SDT版本 - 消除硬编码]
@@ -1361,6 +1616,10 @@ class GeneratedParser:
         self.temp_counter = 0
         self.label_counter = 0
         self.symbol_table = {{}}
+        # 未定义变量建议用的"删除一个字符"索引：(删去第i个字符后的串, i) -> 变量名
+        self._deletion_index = {{}}
+        self._indexed_table = None
+        self._indexed_count = 0
         
         # [语言特性] 变量声明要求（从语法规则元数据中读取）
         self.requires_explicit_declaration = {require_explicit}
@@ -1384,6 +1643,20 @@ class GeneratedParser:
         
         # [回填技术] 用于控制流语句的回填
         self.backpatch_stack = []
+
+        # 带引号的终结符 -> token类型（去掉引号），判断终结符与取类型名只需一次字典查找
+        # token类型名驻留，与词法分析器产生的 token.type 按指针比较即可命中
+        self._token_type_of = {{
+            symbol: intern(symbol[1:-1])
+            for productions in self.grammar.values() for production in productions for symbol in production
+            if symbol.startswith("'") and symbol.endswith("'")
+        }}
+
+        # 预测分析表：非终结符 -> {{token类型: 产生式下标}}
+        self._build_parse_table()
+
+        # [SDT] 预先为每个产生式选定翻译动作
+        self._compile_sdt_actions()
     
     # [消除硬编码] 从词法规则中提取token分类
     def _extract_token_categories(self):
@@ -1424,14 +1697,20 @@ class GeneratedParser:
     # [SDT] 代码生成辅助方法
     def new_temp(self):
         self.temp_counter += 1
-        return f"t{{self.temp_counter}}"
+        n = self.temp_counter
+        return _TEMP_NAMES[n - 1] if n <= len(_TEMP_NAMES) else f"t{{n}}"
     
     def new_label(self):
         self.label_counter += 1
-        return f"L{{self.label_counter}}"
+        n = self.label_counter
+        return _LABEL_NAMES[n - 1] if n <= len(_LABEL_NAMES) else f"L{{n}}"
     
     def emit(self, code):
         self.code_buffer.append(code)
+
+    def emit_many(self, *codes):
+        """一次发出多条中间代码指令（整批 extend 进缓冲区）"""
+        self.code_buffer.extend(codes)
     
     def get_generated_code(self):
         return '\\n'.join(self.code_buffer)
@@ -1494,16 +1773,15 @@ class GeneratedParser:
         )
     
     def _is_terminal(self, symbol: str) -> bool:
-        if symbol.startswith("'") and symbol.endswith("'"):
-            return True
-        return symbol in ['EOF']  # 基本终结符检查
+        return symbol in self._token_type_of or symbol == 'EOF'  # 基本终结符检查
     
     def _get_first_set_for_sequence(self, sequence: List[str]) -> Set[str]:
         """计算符号序列的FIRST集"""
         first_set = set()
+        token_type_of = self._token_type_of
         for Y in sequence:
-            if self._is_terminal(Y):
-                token_type = Y[1:-1] if Y.startswith("'") else Y
+            token_type = token_type_of.get(Y, Y if Y == 'EOF' else None)
+            if token_type is not None:
                 first_set.add(token_type)
                 return first_set
             else:
@@ -1513,129 +1791,142 @@ class GeneratedParser:
         first_set.add('EPSILON')
         return first_set
     
+    def _build_parse_table(self):
+        """构建预测分析表 self._dispatch[非终结符][token类型] = 产生式下标
+
+        与逐个产生式检查 FIRST/FOLLOW 的选择结果一致：产生式按顺序登记，
+        同一 token 只保留最先登记的产生式。解析时一次字典查找即可选定产生式。
+        """
+        self._dispatch = {{}}
+        for symbol, productions in self.grammar.items():
+            table = self._dispatch[symbol] = {{}}
+            follow_set = self.follow_sets.get(symbol, set())
+            for index, production in enumerate(productions):
+                production_first_set = self._get_first_set_for_sequence(production)
+                for token_type in production_first_set:
+                    table.setdefault(token_type, index)
+                if 'EPSILON' in production_first_set:
+                    for token_type in follow_set:
+                        table.setdefault(token_type, index)
+    
     def parse_symbol(self, symbol: str):
-        # 终结符（带引号）[SDT: 设置综合属性]
-        if symbol.startswith("'") and symbol.endswith("'"):
-            token_type = symbol[1:-1]
-            token = self.expect(token_type)
-            node = ASTNode(name=symbol, token=token)
-            node.synthesized_value = token.value if token else None
-            return node
-        
-        # 非终结符 [SDT: 解析后立即生成代码]
-        if symbol in self.grammar:
-            current_token_type = self.current_token().type
-            productions = self.grammar[symbol]
-            found_production = None
-            
-            # 使用FIRST集进行预测，选择匹配的产生式
-            if found_production is None:
-                for production in productions:
-                    production_first_set = self._get_first_set_for_sequence(production)
-                    if current_token_type in production_first_set:
-                        found_production = production
-                        break
-                    if 'EPSILON' in production_first_set:
-                        if current_token_type in self.follow_sets.get(symbol, set()):
-                            found_production = production
-                            break
-            
-            if found_production is not None:
-                # 处理空产生式（epsilon）
-                if not found_production or len(found_production) == 0:
-                    node = ASTNode(name=symbol, children=[])
-                    # [SDT] 识别产生式后立即执行翻译动作
-                    if hasattr(self, '_apply_sdt_rules'):
-                        self._apply_sdt_rules(symbol, found_production, node)
-                    return node
-                
-                # [回填技术] 检测是否是控制流语句
-                is_if_stmt = 'If' in symbol and len(found_production) >= 5
-                is_while_stmt = 'While' in symbol and len(found_production) >= 5
-                is_control_flow = is_if_stmt or is_while_stmt
-                
-                children = []
-                
-                # 对控制流语句使用回填技术
-                if is_control_flow:
-                    # 解析前4个子符号：keyword lparen condition rparen
-                    for i in range(min(4, len(found_production))):
-                        child = self.parse_symbol(found_production[i])
-                        children.append(child)
-                    
-                    # 获取condition的值
-                    condition_val = children[2].synthesized_value if len(children) > 2 else None
-                    
-                    # [回填] 在解析Stmt之前，先生成条件跳转代码
-                    exit_label = self.new_label()
-                    loop_label = None
-                    
-                    if is_while_stmt:
-                        loop_label = self.new_label()
+        """从 symbol 开始解析一棵子树 [SDT: 解析过程中同时生成代码]
+
+        用显式栈代替递归：每个正在展开的非终结符对应栈中一帧
+        [符号, 产生式, 已完成的子节点, 控制流类型, 退出标签, 循环标签, 翻译动作]，
+        长语句序列与深层嵌套不受 Python 递归深度限制；子符号的解析顺序、
+        翻译动作与回填代码的生成顺序与递归下降完全一致。
+        """
+        token_type_of = self._token_type_of
+        grammar = self.grammar
+        dispatch = self._dispatch
+        sdt_actions = self._sdt_actions
+        control_kinds = self._control_kinds
+        # 当前token在循环内直接按下标取，不逐次经过 current_token()/expect() 的方法调用
+        tokens = self.tokens
+        token_count = len(tokens)
+        stack = []
+
+        while True:
+            # 1. 展开 symbol：终结符与空产生式直接得到节点，其余非终结符压入新的一帧
+            pos = self.pos
+            current = tokens[pos] if pos < token_count else tokens[-1]
+            token_type = token_type_of.get(symbol)
+            if token_type is not None:
+                # 终结符（带引号）[SDT: 设置综合属性]
+                if current.type == token_type:
+                    # 与 advance() 一致：停在最后一个token（EOF）上不再前进
+                    if pos < token_count - 1:
+                        self.pos = pos + 1
+                    token = current
+                else:
+                    token = self.expect(token_type)  # 不匹配：由 expect 报告语法错误
+                node = ASTNode(name=symbol, token=token)
+                node.synthesized_value = token.value if token else None
+            elif symbol in grammar:
+                # 非终结符：查预测分析表选定产生式（表由FIRST/FOLLOW集预先构建）
+                found_index = dispatch[symbol].get(current.type, -1)
+                if found_index < 0:
+                    self._raise_no_production(symbol)
+                found_production = grammar[symbol][found_index]
+                if not found_production:
+                    # 处理空产生式（epsilon）[SDT] 识别产生式后立即执行翻译动作
+                    node = ASTNode(name=symbol)
+                    action = sdt_actions[symbol][found_index]
+                    if action is not None:
+                        action(node)
+                else:
+                    # [回填技术] 控制流类型已在 _compile_sdt_actions 中按产生式算好
+                    stack.append([symbol, found_production, [], control_kinds[symbol][found_index],
+                                  None, None, sdt_actions[symbol][found_index]])
+                    symbol = found_production[0]
+                    continue
+            elif current.type == symbol:
+                # 直接匹配token类型
+                node = ASTNode(name=symbol, token=self.advance())
+            else:
+                raise SyntaxError(f"未知符号: {{symbol}}")
+
+            # 2. 把完成的节点交给栈顶帧；若该帧的子符号已全部解析，则生成该帧的节点继续向上
+            while stack:
+                frame = stack[-1]
+                production = frame[1]
+                children = frame[2]
+                children.append(node)
+                done = len(children)
+
+                if frame[3] and done == 4:
+                    # [回填] 已解析 keyword lparen condition rparen，在解析Stmt之前先生成条件跳转代码
+                    condition_val = children[2].synthesized_value
+                    exit_label = frame[4] = self.new_label()
+                    if frame[3] == 2:
+                        loop_label = frame[5] = self.new_label()
                         self.emit(f"{{loop_label}}:")
-                    
                     if condition_val:
                         temp = self.new_temp()
-                        self.emit(f"{{temp}} = not {{condition_val}}")
-                        self.emit(f"if {{temp}} goto {{exit_label}}")
-                    
-                    # 现在解析Stmt（第5个子符号），代码会生成在条件跳转之后
-                    if len(found_production) > 4:
-                        child = self.parse_symbol(found_production[4])
-                        children.append(child)
-                    
-                    # 解析剩余子符号
-                    for i in range(5, len(found_production)):
-                        child = self.parse_symbol(found_production[i])
-                        children.append(child)
-                    
-                    # [回填] 添加退出标签
-                    if is_while_stmt and loop_label:
-                        self.emit(f"goto {{loop_label}}")
-                    self.emit(f"{{exit_label}}:")
-                    
-                    node = ASTNode(name=symbol, children=children)
-                    # 控制流语句的SDT已经在上面处理，不需要再调用_apply_sdt_rules
-                    return node
+                        self.emit_many(f"{{temp}} = not {{condition_val}}",
+                                       f"if {{temp}} goto {{exit_label}}")
+
+                if done < len(production):
+                    symbol = production[done]
+                    break
+
+                stack.pop()
+                node = ASTNode(name=frame[0], children=children)
+                if frame[3]:
+                    # [回填] 添加退出标签；控制流语句的SDT已经在上面处理，不需要再执行翻译动作
+                    if frame[3] == 2:
+                        self.emit_many(f"goto {{frame[5]}}", f"{{frame[4]}}:")
+                    else:
+                        self.emit(f"{{frame[4]}}:")
                 else:
-                    # 非控制流语句：正常递归解析
-                    for sym in found_production:
-                        child = self.parse_symbol(sym)
-                        children.append(child)
-                
-                node = ASTNode(name=symbol, children=children)
-                
-                # [SDT] 识别产生式后立即执行翻译动作
-                if hasattr(self, '_apply_sdt_rules'):
-                    self._apply_sdt_rules(symbol, found_production, node)
-                
+                    # [SDT] 识别产生式后立即执行翻译动作（动作已在 __init__ 中按产生式选定）
+                    action = frame[6]
+                    if action is not None:
+                        action(node)
+            else:
                 return node
-            
-            # 所有产生式都失败，生成详细的错误信息
-            current = self.current_token()
-            expected_tokens = []
-            for prod in self.grammar[symbol]:
-                if prod and len(prod) > 0 and prod[0].startswith("'") and prod[0].endswith("'"):
-                    expected_tokens.append(prod[0][1:-1])
-            
-            # 如果符号可以为空，添加FOLLOW集
-            if self.epsilon_symbol in self.first_sets.get(symbol, set()):
-                expected_tokens.extend(list(self.follow_sets.get(symbol, set())))
-            
-            expected_str = ", ".join(set(expected_tokens)) if expected_tokens else "未知"
-            raise SyntaxError(
-                f"语法错误：第 {{current.line}} 行，第 {{current.column}} 列\\n"
-                f"  无法解析非终结符 '{{symbol}}'\\n"
-                f"  当前符号：{{current.type}} (值: '{{current.value}}')\\n"
-                f"  期望的符号类型：{{expected_str}}"
-            )
+
+    def _raise_no_production(self, symbol: str):
+        """没有产生式能匹配当前token时，生成详细的错误信息"""
+        current = self.current_token()
+        # 直接用集合收集，避免先建列表再去重
+        expected_tokens = {{
+            prod[0][1:-1] for prod in self.grammar[symbol]
+            if prod and prod[0].startswith("'") and prod[0].endswith("'")
+        }}
         
-        # 直接匹配token类型
-        if self.current_token().type == symbol:
-            token = self.advance()
-            return ASTNode(name=symbol, token=token)
+        # 如果符号可以为空，添加FOLLOW集
+        if self.epsilon_symbol in self.first_sets.get(symbol, ()):
+            expected_tokens.update(self.follow_sets.get(symbol, ()))
         
-        raise SyntaxError(f"未知符号: {{symbol}}")
+        expected_str = ", ".join(expected_tokens) if expected_tokens else "未知"
+        raise SyntaxError(
+            f"语法错误：第 {{current.line}} 行，第 {{current.column}} 列\\n"
+            f"  无法解析非终结符 '{{symbol}}'\\n"
+            f"  当前符号：{{current.type}} (值: '{{current.value}}')\\n"
+            f"  期望的符号类型：{{expected_str}}"
+        )
     
     def _is_binary_operator_by_structure(self, production: List[str], op_index: int) -> bool:
         """通过产生式结构识别二元运算符（完全不硬编码token类型）
@@ -1704,34 +1995,40 @@ class GeneratedParser:
         return temp
     
     def _apply_sdt_rules(self, symbol, production, node):
-        """应用SDT规则：根据产生式生成代码（基于属性文法，不硬编码token类型）"""
-        children = node.children
-        
+        """应用SDT规则：根据产生式生成代码（基于属性文法，不硬编码token类型）
+
+        parse_symbol 直接使用 __init__ 中预先选好的动作（self._sdt_actions），不经过这里的模式匹配。
+        """
+        action = self._select_sdt_action(symbol, production)
+        if action is not None:
+            action(node)
+
+    def _compile_sdt_actions(self):
+        """[SDT] 为每个产生式预先选定翻译动作：self._sdt_actions[非终结符][产生式下标]"""
+        self._sdt_actions = {{
+            symbol: [self._select_sdt_action(symbol, production) for production in productions]
+            for symbol, productions in self.grammar.items()
+        }}
+        # [回填技术] 控制流类型（0: 否, 1: if, 2: while）同样只取决于产生式，一并预先算好
+        self._control_kinds = {{
+            symbol: [(2 if 'While' in symbol else 1 if 'If' in symbol else 0) if len(production) >= 5 else 0
+                     for production in productions]
+            for symbol, productions in self.grammar.items()
+        }}
+
+    def _select_sdt_action(self, symbol, production):
+        """按产生式结构选择翻译动作（模式按优先级依次匹配），结构性产生式返回 None"""
         # 单个终结符产生式：通过token对象的type属性识别（消除硬编码）
         if len(production) == 1 and production[0].startswith("'"):
-            # 获取token对象（从属性中获取，不硬编码）
-            token = children[0].token if hasattr(children[0], 'token') and children[0].token else None
-            value = children[0].synthesized_value
-            
-            # 通过token.type属性识别标识符（从词法规则中提取，不硬编码）
-            # 修复：只有标识符类型才需要检查变量定义
-            if token and hasattr(token, 'type') and self.enable_variable_check:
-                # 消除硬编码：只检查标识符类型的token
-                if token.type in self.identifier_tokens:
-                    if value and value not in self.symbol_table:
-                        self.check_variable_defined(value, token)
-            
-            node.synthesized_value = value
+            return self._sdt_single_terminal
         
         # 表达式尾部（处理加减法）：Term ExprTail 或 Term Expr_LF_TAIL_X
         elif len(production) == 2 and not production[0].startswith("'") and not production[1].startswith("'"):
-            left_val = children[0].synthesized_value
-            tail_val = self._handle_tail(children[1], left_val)
-            node.synthesized_value = tail_val
+            return self._sdt_tail
         
         # 单个子节点（传递值）- 通用情况，放在最后
         elif len(production) == 1:
-            node.synthesized_value = children[0].synthesized_value
+            return self._sdt_pass_through
         
         # 括号表达式：left_paren Expr right_paren（消除硬编码）
         # 模式：第一个是左括号token，第二个是非终结符，第三个是右括号token
@@ -1739,239 +2036,270 @@ class GeneratedParser:
               production[0].startswith("'") and production[0][1:-1] in self.left_paren_tokens and
               not production[1].startswith("'") and
               production[2].startswith("'") and production[2][1:-1] in self.right_paren_tokens):
-            node.synthesized_value = children[1].synthesized_value
+            return self._sdt_paren
         
         # 赋值语句：identifier_token operator_token Expr ...（消除硬编码）
         elif (len(production) >= 3 and 
               production[0].startswith("'") and production[0][1:-1] in self.identifier_tokens and
               production[1].startswith("'") and production[1][1:-1] in self.operator_tokens):
-            var_name = children[0].synthesized_value
-            expr_val = children[2].synthesized_value
-            if var_name:
-                # [语义检查] 根据语言类型决定是否检查变量声明
-                if var_name not in self.symbol_table:
-                    if self.requires_explicit_declaration:
-                        token = children[0].token if hasattr(children[0], 'token') and children[0].token else None
-                        self.check_variable_defined(var_name, token)
-                    self.symbol_table[var_name] = {{'type': 'var'}}
-                if expr_val:
-                    self.emit(f"{{var_name}} = {{expr_val}}")
+            return self._sdt_assign
         
         # 输出语句：keyword_token punctuation_token Expr punctuation_token ...（消除硬编码）
         elif (len(production) >= 4 and 
               production[0].startswith("'") and production[1].startswith("'") and 
               not production[2].startswith("'")):
             # 消除硬编码：通过词法规则动态识别关键字和标点
-            first_token_type = production[0][1:-1]
-            second_token_type = production[1][1:-1]
-            if (first_token_type in self.keyword_tokens and 
-                second_token_type in self.punctuation_tokens):
-                expr_val = children[2].synthesized_value
-                if expr_val:
-                    self.emit(f"param {{expr_val}}")
-                    self.emit(f"call write, 1")
+            if (production[0][1:-1] in self.keyword_tokens and 
+                production[1][1:-1] in self.punctuation_tokens):
+                return self._sdt_write
+            return None
         
         # 输入语句：keyword_token identifier_token ...（消除硬编码）
         elif (len(production) >= 2 and 
               production[0].startswith("'") and production[0][1:-1] in self.keyword_tokens and
               production[1].startswith("'") and production[1][1:-1] in self.identifier_tokens):
-            var_name = children[1].synthesized_value
-            if var_name:
-                temp = self.new_temp()
-                self.emit(f"{{temp}} = call read, 0")
-                self.emit(f"{{var_name}} = {{temp}}")
+            return self._sdt_read
         
         # 变量声明列表：identifier_token ...（消除硬编码）
         elif (len(production) >= 2 and 
               production[0].startswith("'") and production[0][1:-1] in self.identifier_tokens and
               not production[1].startswith("'")):
-            # 收集所有声明的变量并添加到符号表
-            # 模式：identifier_token Tail，其中Tail可能是 punctuation_token identifier_token Tail | ε
-            def collect_ids_from_tail(tail_node):
-                """递归收集尾部的所有变量名（消除硬编码）"""
-                var_names = []
-                if not tail_node or not tail_node.children:
-                    return var_names
-                
-                # 检查是否是 punctuation_token identifier_token ... 模式
-                if len(tail_node.children) >= 2:
-                    comma_node = tail_node.children[0]
-                    id_node = tail_node.children[1]
-                    # 消除硬编码：通过词法规则动态识别
-                    if comma_node.token and comma_node.token.type in self.punctuation_tokens:
-                        if id_node.token and id_node.token.type in self.identifier_tokens:
-                            var_name = id_node.synthesized_value
-                            if var_name:
-                                var_names.append(var_name)
-                                self.symbol_table[var_name] = {{'type': 'var'}}
-                        
-                        # 递归处理剩余的尾部
-                        if len(tail_node.children) > 2:
-                            next_tail = tail_node.children[2]
-                            var_names.extend(collect_ids_from_tail(next_tail))
-                
-                return var_names
-            
-            # 处理第一个identifier（消除硬编码）
-            if children[0].token and children[0].token.type in self.identifier_tokens:
-                var_name = children[0].synthesized_value
-                if var_name:
-                    self.symbol_table[var_name] = {{'type': 'var'}}
-            
-            # 处理尾部中的所有ID
-            if len(children) > 1:
-                tail = children[1]
-                collect_ids_from_tail(tail)
+            return self._sdt_var_decl
         
         # 布尔表达式/Condition：通过结构识别（Expr RelOp Expr 或 Expr Op Expr）
         elif len(production) >= 3 and not production[0].startswith("'") and not production[2].startswith("'"):
-            # Condition -> Expr RelOp Expr 或 Expr -> Expr Op Expr
             # 第二个可能是非终结符（RelOp）或终结符（操作符）
             if production[1].startswith("'"):
-                # 第二个是终结符：Expr Op Expr
-                op_token_type = production[1][1:-1]
-                if children[1].token and children[1].token.type == op_token_type:
-                    e1 = children[0].synthesized_value
-                    op = children[1].synthesized_value
-                    e2 = children[2].synthesized_value
-                    if e1 and op and e2:
-                        temp = self.new_temp()
-                        self.emit(f"{{temp}} = {{e1}} {{op}} {{e2}}")
-                        node.synthesized_value = temp
-            else:
-                # 第二个是非终结符：Expr RelOp Expr（Condition产生式）
-                e1 = children[0].synthesized_value
-                relop_val = children[1].synthesized_value  # RelOp的值
-                e2 = children[2].synthesized_value
-                if e1 and relop_val and e2:
-                    temp = self.new_temp()
-                    self.emit(f"{{temp}} = {{e1}} {{relop_val}} {{e2}}")
-                    node.synthesized_value = temp
+                return self._sdt_binary_op
+            return self._sdt_relation
         
         # 关系运算符（单个token）：通过结构识别（单个终结符，消除硬编码）
         elif len(production) == 1 and production[0].startswith("'"):
-            op_token_type = production[0][1:-1]
             # 消除硬编码：通过词法规则动态识别操作符
-            if op_token_type in self.operator_tokens:
-                node.synthesized_value = children[0].synthesized_value
+            if production[0][1:-1] in self.operator_tokens:
+                return self._sdt_pass_through
+            return None
         
         # 控制流语句：keyword_token punctuation_token Condition punctuation_token Stmt（消除硬编码）
         elif (len(production) >= 5 and 
               production[0].startswith("'") and production[0][1:-1] in self.keyword_tokens and
               production[1].startswith("'") and production[1][1:-1] in self.punctuation_tokens):
-            
-            bool_val = children[2].synthesized_value
-            stmt_code_start = len(self.code_buffer)
-            
             # 通过非终结符名称区分if和while
             if 'While' in symbol or 'WHILE' in symbol or 'Loop' in symbol:
-                # while循环：使用代码插入
-                loop_label = self.new_label()
-                exit_label = self.new_label()
-                self.code_buffer.insert(stmt_code_start, f"{{loop_label}}:")
-                if bool_val:
-                    temp = self.new_temp()
-                    self.code_buffer.insert(stmt_code_start + 1, f"{{temp}} = not {{bool_val}}")
-                    self.code_buffer.insert(stmt_code_start + 2, f"if {{temp}} goto {{exit_label}}")
-                self.emit(f"goto {{loop_label}}")
-                self.emit(f"{{exit_label}}:")
-            else:
-                # if语句：使用代码插入
-                exit_label = self.new_label()
-                if bool_val:
-                    temp = self.new_temp()
-                    self.code_buffer.insert(stmt_code_start, f"{{temp}} = not {{bool_val}}")
-                    self.code_buffer.insert(stmt_code_start + 1, f"if {{temp}} goto {{exit_label}}")
-                self.emit(f"{{exit_label}}")
+                return self._sdt_while_stmt
+            return self._sdt_if_stmt
         
         # 其他情况（不匹配任何已知模式的结构性节点，不生成代码）
+        return None
+
+    # [SDT] 翻译动作：由 _select_sdt_action 按产生式结构选定
+    def _sdt_single_terminal(self, node):
+        """单个终结符：传递词法值，标识符需检查是否已定义"""
+        child = node.children[0]
+        token = child.token if child.token else None
+        value = child.synthesized_value
+        
+        # 通过token.type属性识别标识符（从词法规则中提取，不硬编码）
+        # 修复：只有标识符类型才需要检查变量定义
+        if token and hasattr(token, 'type') and self.enable_variable_check:
+            # 消除硬编码：只检查标识符类型的token
+            if token.type in self.identifier_tokens:
+                if value and value not in self.symbol_table:
+                    self.check_variable_defined(value, token)
+        
+        node.synthesized_value = value
+
+    def _sdt_tail(self, node):
+        """操作数 + 尾部：把左操作数沿尾部向下传递"""
+        children = node.children
+        left_val = children[0].synthesized_value
+        node.synthesized_value = self._handle_tail(children[1], left_val)
+
+    def _sdt_pass_through(self, node):
+        """单个子节点：传递综合属性"""
+        node.synthesized_value = node.children[0].synthesized_value
+
+    def _sdt_paren(self, node):
+        """括号表达式：取括号内表达式的值"""
+        node.synthesized_value = node.children[1].synthesized_value
+
+    def _sdt_assign(self, node):
+        """赋值语句：登记变量并生成赋值指令"""
+        children = node.children
+        var_name = children[0].synthesized_value
+        expr_val = children[2].synthesized_value
+        if var_name:
+            # [语义检查] 根据语言类型决定是否检查变量声明
+            if var_name not in self.symbol_table:
+                if self.requires_explicit_declaration:
+                    token = children[0].token if children[0].token else None
+                    self.check_variable_defined(var_name, token)
+                self.symbol_table[var_name] = _VAR_ENTRY
+            if expr_val:
+                self.emit(f"{{var_name}} = {{expr_val}}")
+
+    def _sdt_write(self, node):
+        """输出语句：生成 write 调用"""
+        expr_val = node.children[2].synthesized_value
+        if expr_val:
+            self.emit_many(f"param {{expr_val}}", "call write, 1")
+
+    def _sdt_read(self, node):
+        """输入语句：生成 read 调用并赋值"""
+        var_name = node.children[1].synthesized_value
+        if var_name:
+            temp = self.new_temp()
+            self.emit_many(f"{{temp}} = call read, 0", f"{{var_name}} = {{temp}}")
+
+    def _sdt_var_decl(self, node):
+        """变量声明列表：把声明的变量全部登记到符号表"""
+        # dict.fromkeys 在 C 层批量建表，update 一次合并，不为每个变量名构造 (键, 值) 元组
+        self.symbol_table.update(dict.fromkeys(self._iter_declared_ids(node.children), _VAR_ENTRY))
+
+    def _iter_declared_ids(self, children):
+        """依次产生声明的变量名：identifier_token Tail，Tail -> punctuation_token identifier_token Tail | ε"""
+        # 处理第一个identifier（消除硬编码）
+        if children[0].token and children[0].token.type in self.identifier_tokens:
+            var_name = children[0].synthesized_value
+            if var_name:
+                yield var_name
+        
+        # 沿尾部链循环收集其余ID（不递归）
+        tail_node = children[1] if len(children) > 1 else None
+        while tail_node and len(tail_node.children) >= 2:
+            comma_node = tail_node.children[0]
+            id_node = tail_node.children[1]
+            # 消除硬编码：通过词法规则动态识别
+            if not (comma_node.token and comma_node.token.type in self.punctuation_tokens):
+                break
+            if id_node.token and id_node.token.type in self.identifier_tokens:
+                var_name = id_node.synthesized_value
+                if var_name:
+                    yield var_name
+            tail_node = tail_node.children[2] if len(tail_node.children) > 2 else None
+
+    def _sdt_binary_op(self, node):
+        """Expr Op Expr（操作符为终结符）：生成二元运算"""
+        children = node.children
+        # 终结符子节点由 expect() 按产生式中的token类型匹配得到，类型必然一致
+        if children[1].token:
+            e1 = children[0].synthesized_value
+            op = children[1].synthesized_value
+            e2 = children[2].synthesized_value
+            if e1 and op and e2:
+                temp = self.new_temp()
+                self.emit(f"{{temp}} = {{e1}} {{op}} {{e2}}")
+                node.synthesized_value = temp
+
+    def _sdt_relation(self, node):
+        """Expr RelOp Expr（Condition产生式）：生成关系运算"""
+        children = node.children
+        e1 = children[0].synthesized_value
+        relop_val = children[1].synthesized_value  # RelOp的值
+        e2 = children[2].synthesized_value
+        if e1 and relop_val and e2:
+            temp = self.new_temp()
+            self.emit(f"{{temp}} = {{e1}} {{relop_val}} {{e2}}")
+            node.synthesized_value = temp
+
+    def _sdt_while_stmt(self, node):
+        """未经回填处理的while循环：使用代码插入"""
+        bool_val = node.children[2].synthesized_value
+        stmt_code_start = len(self.code_buffer)
+        loop_label = self.new_label()
+        exit_label = self.new_label()
+        self.code_buffer.insert(stmt_code_start, f"{{loop_label}}:")
+        if bool_val:
+            temp = self.new_temp()
+            self.code_buffer.insert(stmt_code_start + 1, f"{{temp}} = not {{bool_val}}")
+            self.code_buffer.insert(stmt_code_start + 2, f"if {{temp}} goto {{exit_label}}")
+        self.emit_many(f"goto {{loop_label}}", f"{{exit_label}}:")
+
+    def _sdt_if_stmt(self, node):
+        """未经回填处理的if语句：使用代码插入"""
+        bool_val = node.children[2].synthesized_value
+        stmt_code_start = len(self.code_buffer)
+        exit_label = self.new_label()
+        if bool_val:
+            temp = self.new_temp()
+            self.code_buffer.insert(stmt_code_start, f"{{temp}} = not {{bool_val}}")
+            self.code_buffer.insert(stmt_code_start + 1, f"if {{temp}} goto {{exit_label}}")
+        self.emit(f"{{exit_label}}")
     
     def _handle_tail(self, tail_node, left_val):
-        """处理表达式尾部（通过结构识别，不依赖节点名称）"""
-        if not tail_node or not tail_node.children:
-            return left_val
-        children = tail_node.children
-        
-        # 格式1: 单个子节点，且是操作节点（通过产生式结构识别：操作符 + 操作数）
-        # 模式：单个子节点，且该子节点有至少2个子节点（操作符 + 操作数）
-        # 完全基于结构：第一个是终结符（操作符），第二个是非终结符或终结符（操作数）
-        if len(children) == 1 and children[0].children:
-            if len(children[0].children) >= 2:
-                first_child = children[0].children[0]
-                if first_child.token:
-                    # 通过结构识别：第一个是终结符，第二个是操作数
-                    op_val = first_child.synthesized_value
-                    right_val = children[0].children[1].synthesized_value
-                    if op_val and right_val:
-                        # 使用通用的二元运算符处理函数
-                        return self._apply_binary_op(op_val, left_val, right_val)
-        
-        # 格式2: 直接包含操作符的结构（未优化的文法）
-        # 通过结构识别：第一个是操作符token（终结符），第二个是操作数
-        # 完全基于结构：不判断token类型，只判断结构
-        if children and children[0].token and len(children) >= 2:
-            # 通过结构判断：第一个是终结符，第二个是操作数
-            op = children[0].synthesized_value
+        """处理表达式尾部（通过结构识别，不依赖节点名称）
+
+        沿尾部链循环处理（不递归），长运算链不会逐项加深调用栈。
+        """
+        while tail_node and tail_node.children:
+            children = tail_node.children
+            
+            # 格式1: 单个子节点，且是操作节点（通过产生式结构识别：操作符 + 操作数）
+            # 模式：单个子节点，且该子节点有至少2个子节点（操作符 + 操作数）
+            # 完全基于结构：第一个是终结符（操作符），第二个是非终结符或终结符（操作数）
+            first = children[0]
+            if len(children) == 1:
+                grandchildren = first.children
+                if len(grandchildren) >= 2:
+                    first_child = grandchildren[0]
+                    if first_child.token:
+                        # 通过结构识别：第一个是终结符，第二个是操作数
+                        op_val = first_child.synthesized_value
+                        right_val = grandchildren[1].synthesized_value
+                        if op_val and right_val:
+                            # 使用通用的二元运算符处理函数
+                            return self._apply_binary_op(op_val, left_val, right_val)
+                break
+            
+            # 格式2: 直接包含操作符的结构（未优化的文法）
+            # 通过结构识别：第一个是操作符token（终结符），第二个是操作数
+            # 完全基于结构：不判断token类型，只判断结构
+            if not first.token:
+                break
+            op = first.synthesized_value
             right = children[1].synthesized_value
-            if op and right:
-                temp = self.new_temp()
-                self.emit(f"{{temp}} = {{left_val}} {{op}} {{right}}")
-                if len(children) > 2:
-                    return self._handle_tail(children[2], temp)
-                return temp
-        return left_val
-    
-    def _handle_add_op(self, add_op_node, left_val):
-        """处理加法操作节点（通过结构识别，不依赖节点名称和token类型）"""
-        if not add_op_node or not add_op_node.children:
-            return left_val
-        children = add_op_node.children
-        # 通过结构识别：第一个是操作符（终结符），第二个是操作数（非终结符或终结符）
-        # 完全基于结构：不判断token类型，只判断结构
-        if len(children) >= 2 and children[0].token:
-            op = children[0].synthesized_value
-            right_val = children[1].synthesized_value
-            if op and right_val:
-                temp = self.new_temp()
-                self.emit(f"{{temp}} = {{left_val}} {{op}} {{right_val}}")
-                # 检查是否还有递归的操作节点（通过结构识别）
-                if len(children) > 2:
-                    tail = children[2]
-                    if tail.children and len(tail.children) == 1:
-                        tail_child = tail.children[0]
-                        # 检查是否是操作节点结构（操作符 + 操作数）
-                        if tail_child.children and len(tail_child.children) >= 2:
-                            if tail_child.children[0].token:
-                                # 递归处理，不判断token类型
-                                return self._handle_add_op(tail_child, temp)
-                return temp
+            if not (op and right):
+                break
+            temp = self.new_temp()
+            self.emit(f"{{temp}} = {{left_val}} {{op}} {{right}}")
+            left_val = temp
+            # 继续处理剩余的尾部
+            if len(children) <= 2:
+                break
+            tail_node = children[2]
         return left_val
     
-    def _handle_mul_op(self, mul_op_node, left_val):
-        """处理乘法操作节点（通过结构识别，不依赖节点名称和token类型）"""
-        if not mul_op_node or not mul_op_node.children:
-            return left_val
-        children = mul_op_node.children
-        # 通过结构识别：第一个是操作符（终结符），第二个是操作数（非终结符或终结符）
-        # 完全基于结构：不判断token类型，只判断结构
-        if len(children) >= 2 and children[0].token:
-            op = children[0].synthesized_value
+    def _handle_op_node(self, op_node, left_val):
+        """处理加法/乘法操作节点（通过结构识别，不依赖节点名称和token类型）
+
+        结构：操作符（终结符） 操作数 [尾部]；尾部若只含一个操作节点则循环处理，不递归。
+        """
+        while op_node and len(op_node.children) >= 2:
+            children = op_node.children
+            # 通过结构识别：第一个是操作符（终结符），第二个是操作数（非终结符或终结符）
+            # 完全基于结构：不判断token类型，只判断结构
+            first = children[0]
+            if not first.token:
+                break
+            op = first.synthesized_value
             right_val = children[1].synthesized_value
-            if op and right_val:
-                temp = self.new_temp()
-                self.emit(f"{{temp}} = {{left_val}} {{op}} {{right_val}}")
-                # 检查是否还有递归的操作节点（通过结构识别）
-                if len(children) > 2:
-                    tail = children[2]
-                    if tail.children and len(tail.children) == 1:
-                        tail_child = tail.children[0]
-                        # 检查是否是操作节点结构（操作符 + 操作数）
-                        if tail_child.children and len(tail_child.children) >= 2:
-                            if tail_child.children[0].token:
-                                # 递归处理，不判断token类型
-                                return self._handle_mul_op(tail_child, temp)
-                return temp
+            if not (op and right_val):
+                break
+            temp = self.new_temp()
+            self.emit(f"{{temp}} = {{left_val}} {{op}} {{right_val}}")
+            left_val = temp
+            # 检查是否还有下一个操作节点（通过结构识别）
+            if len(children) <= 2:
+                break
+            tail_children = children[2].children
+            if len(tail_children) != 1:
+                break
+            op_node = tail_children[0]
         return left_val
+
+    # 加法与乘法操作节点结构相同，由同一个方法处理
+    _handle_add_op = _handle_op_node
+    _handle_mul_op = _handle_op_node
     
     def check_variable_defined(self, var_name: str, token = None):
         """检查变量是否已定义，如果未定义则记录错误并提供建议"""
@@ -1986,18 +2314,10 @@ class GeneratedParser:
         column = token.column if token else 0
         
         # 获取所有已定义的变量名
-        defined_vars = set(self.symbol_table.keys())
-        
-        # 简单的编辑距离建议（可以改进）
-        suggestion = None
-        if defined_vars:
-            # 简单的字符串相似度检查
-            for defined_var in defined_vars:
-                if len(var_name) == len(defined_var):
-                    diff = sum(1 for a, b in zip(var_name, defined_var) if a != b)
-                    if diff == 1:  # 只有一个字符不同
-                        suggestion = defined_var
-                        break
+        defined_vars = self.symbol_table
+        
+        # 简单的编辑距离建议：只有一个字符不同的已定义变量
+        suggestion = self._find_one_char_variant(var_name) if defined_vars else None
         
         error_msg = f"语义错误：第 {{line}} 行，第 {{column}} 列 - 变量 '{{var_name}}' 未定义"
         if suggestion:
@@ -2008,6 +2328,34 @@ class GeneratedParser:
         self.semantic_errors.append(error_msg)
         return False
     
+    def _find_one_char_variant(self, var_name: str):
+        """查找与 var_name 等长且只有一个字符不同的已定义变量
+
+        两个等长的不同名字恰在第 i 位不同，当且仅当各自删去第 i 个字符后相同，
+        因此用 (删去第i个字符后的串, i) 建索引，查询只需 len(var_name) 次字典查找，
+        与符号表大小无关。符号表只增不减，索引只补充新加入的变量。
+        索引值为 (登记到符号表的次序, 变量名)，有多个候选时返回最先登记的变量。
+        """
+        table = self.symbol_table
+        index = self._deletion_index
+        if self._indexed_table is not table:
+            # 符号表被重置过，索引整体重建
+            index.clear()
+            self._indexed_table = table
+            self._indexed_count = 0
+        if self._indexed_count < len(table):
+            for rank, name in enumerate(islice(table, self._indexed_count, None), self._indexed_count):
+                for i in range(len(name)):
+                    index.setdefault((name[:i] + name[i + 1:], i), (rank, name))
+            self._indexed_count = len(table)
+        
+        best = None
+        for i in range(len(var_name)):
+            entry = index.get((var_name[:i] + var_name[i + 1:], i))
+            if entry is not None and (best is None or entry[0] < best[0]):
+                best = entry
+        return best[1] if best is not None else None
+    
     def get_semantic_errors(self):
         """获取所有语义错误"""
         return self.semantic_errors.copy()
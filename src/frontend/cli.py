@@ -298,6 +298,8 @@ class CompilerCLI:
             start_symbol = list(grammar_rules.keys())[0] if grammar_rules else 'Program'
             # 传入词法规则以消除硬编码
             parser = create_parser_from_spec(grammar_rules, start_symbol, lexer_rules=lexer_rules, metadata=metadata)
+            # 只需要中间代码，子树翻译完成后即可释放
+            parser.retain_ast = False
             try:
                 # [SDT关键] parse方法现在会在解析过程中同时生成中间代码
                 ast = parser.parse(tokens)
@@ -317,9 +319,6 @@ class CompilerCLI:
                     self.logger.error("编译失败：存在语义错误")
                     return 1
                 
-                # [SDT] 从解析器中获取生成的中间代码
-                intermediate_code = parser.get_generated_code()
-                
             except ParseError as e:
                 # 使用错误格式化器显示友好的错误信息
                 formatter = ErrorFormatter(source_code=source_code, source_file=args.source)
@@ -339,18 +338,23 @@ class CompilerCLI:
                     print(f"位置: 第 {error_info['line']} 行, 第 {error_info['column']} 列")
                 return 1
 
-            # 输出结果
+            # 输出结果（[SDT] 中间代码由解析器生成；写文件时直接流式写出）
+            # 仅在打印或生成控制流图时拼接完整字符串，且最多拼接一次
+            intermediate_code = None
             if args.output:
                 with open(args.output, 'w', encoding='utf-8') as f:
-                    f.write(intermediate_code)
+                    parser.write_generated_code(f)
                 self.logger.info(f"中间代码已保存到: {args.output}")
             else:
+                intermediate_code = parser.get_generated_code()
                 print("\n=== 中间代码 ===")
                 print(intermediate_code)
             
             # 生成控制流图
             if getattr(args, 'cfg', False) or getattr(args, 'cfg_block', False):
                 block_mode = getattr(args, 'cfg_block', False)
+                if intermediate_code is None:
+                    intermediate_code = parser.get_generated_code()
                 cfg_mermaid = visualize_tac(intermediate_code, block_mode=block_mode)
                 mode_name = "基本块模式" if block_mode else "指令模式"
                 print(f"\n=== 控制流图 ({mode_name}) ===")
@@ -41,6 +41,51 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     return previous_row[-1]
 
 
+def _bounded_distance(s1: str, s2: str, limit: int) -> int:
+    """计算编辑距离，但只关心不超过 limit 的结果
+    
+    返回:
+        编辑距离不超过 limit 时返回精确值，否则返回 limit + 1
+        
+    说明:
+        距离不超过 limit 的对齐路径只会经过 |i - j| <= limit 的单元格，
+        因此每行只计算这一条带；某一行的最小值已超过 limit 时提前结束。
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    n1, n2 = len(s1), len(s2)
+    if n1 - n2 > limit:
+        return limit + 1
+    
+    over = limit + 1
+    previous_row = [j if j <= limit else over for j in range(n2 + 1)]
+    for i in range(1, n1 + 1):
+        c1 = s1[i - 1]
+        lo = max(1, i - limit)
+        hi = min(n2, i + limit)
+        current_row = [over] * (n2 + 1)
+        current_row[0] = i if i <= limit else over
+        row_min = current_row[0]
+        for j in range(lo, hi + 1):
+            # 三种操作取最小（内联比较，避免每格调用一次 min()）
+            value = previous_row[j - 1] + (c1 != s2[j - 1])
+            other = previous_row[j] + 1
+            if other < value:
+                value = other
+            other = current_row[j - 1] + 1
+            if other < value:
+                value = other
+            if value > over:
+                value = over
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous_row = current_row
+    return previous_row[n2]
+
+
 def find_similar_variables(undefined_var: str, 
                            defined_vars: Set[str], 
                            max_distance: int = 2) -> List[Tuple[str, int]]:
@@ -53,11 +98,19 @@ def find_similar_variables(undefined_var: str,
         
     返回:
         [(变量名, 编辑距离), ...] 按距离排序
+        
+    说明:
+        只需判断距离是否超过阈值，因此使用带阈值的编辑距离：长度差超过阈值的
+        变量直接跳过，其余只计算对角线附近的一条带，超过阈值即提前结束。
     """
     suggestions = []
+    target = undefined_var.lower()
     
     for var in defined_vars:
-        dist = levenshtein_distance(undefined_var.lower(), var.lower())
+        candidate = var.lower()
+        if abs(len(candidate) - len(target)) > max_distance:
+            continue
+        dist = _bounded_distance(target, candidate, max_distance)
         if dist <= max_distance:
             suggestions.append((var, dist))
     
@@ -0,0 +1,36 @@
+"""代码生成器单元测试"""
+
+import io
+
+from src.compiler_generator.code_generator import CodeGenerator
+
+
+class TestCodeGenerator:
+    """代码生成器的测试类"""
+
+    def test_emit_formats(self):
+        """测试不同操作数组合下的指令格式"""
+        gen = CodeGenerator()
+        gen.emit('+', 'a', 'b', 't1')
+        gen.emit('goto', 'L1')
+        gen.emit('halt')
+        gen.emit('', 'x')
+        gen.emit('', 'a', 'b')
+        gen.emit('goto', 'L1 ')
+        gen.emit('', 'y', result='t2')
+        gen.emit('+', 'a', 'b ', 't3')
+        assert gen.code_list == ['t1 = a + b', 'goto L1', 'halt',
+                                 'x', 'a b', 'goto L1', 't2 = y', 't3 = a + b']
+
+    def test_write_code_matches_get_code(self):
+        """测试流式写出的内容与 get_code() 一致（含空代码）"""
+        gen = CodeGenerator()
+        out = io.StringIO()
+        gen.write_code(out)
+        assert out.getvalue() == gen.get_code() == ''
+
+        gen.emit('+', 'a', 'b', 't1')
+        gen.emit('halt')
+        out = io.StringIO()
+        gen.write_code(out)
+        assert out.getvalue() == gen.get_code() == 't1 = a + b\nhalt'
@@ -31,6 +31,18 @@ class TestLexerGenerator:
         assert hasattr(lexer, "compiled_patterns")
         assert len(lexer.compiled_patterns) == 2
 
+    def test_build_again_after_adding_rule(self):
+        """[Basic] Rules added after build() are picked up by the next build()"""
+        lexer = LexerGenerator()
+        lexer.add_token_rule('NUM', r'[0-9]+')
+        lexer.build()
+        with pytest.raises(SyntaxError):
+            lexer.tokenize('1 + 2')
+
+        lexer.add_token_rule('PLUS', r'\+')
+        lexer.build()
+        assert [t.type for t in lexer.tokenize('1 + 2')] == ['NUM', 'PLUS', 'NUM', 'EOF']
+
     # ===================== 2. Simplest Token Sequences =====================
 
     def test_tokenize_single_token(self):
@@ -136,6 +148,23 @@ class TestLexerGenerator:
         assert tokens[1].line == 2
         assert tokens[1].column == 3
 
+    def test_comments_and_whitespace_runs(self):
+        """[Moderate] Line comments and long whitespace runs are skipped, positions stay correct"""
+        lexer = LexerGenerator()
+        lexer.add_token_rule('ID', r'[a-zA-Z]+')
+        lexer.add_token_rule('DIV', r'/')
+        lexer.build()
+
+        code = 'a // note\n\t\t  b / c   // trailing'
+        tokens = lexer.tokenize(code)
+        assert [(t.type, t.value, t.line, t.column) for t in tokens] == [
+            ('ID', 'a', 1, 1),
+            ('ID', 'b', 2, 5),
+            ('DIV', '/', 2, 7),
+            ('ID', 'c', 2, 9),
+            ('EOF', '', 2, 13),
+        ]
+
     # ===================== 5. Keywords vs Identifiers (Priority & Longest Match) =====================
 
     def test_keyword_before_identifier(self):
@@ -202,6 +231,90 @@ class TestLexerGenerator:
         assert values[2] == '23'
         assert values[7] == '456'
 
+    def test_plus_builds_operand_once(self):
+        """[Medium] `a+` is parsed as a PLUS node and still matches one-or-more"""
+        from src.compiler_generator.lexer_generator import RegexParser, thompson
+
+        assert RegexParser('a+').parse() == ('PLUS', ('LIT', 'a'))
+        # One LIT fragment (2 states) instead of LIT + STAR(LIT) (5 states)
+        frag = thompson(RegexParser('a+').parse())
+        seen, stack = set(), [frag.start]
+        while stack:
+            s = stack.pop()
+            if s.id not in seen:
+                seen.add(s.id)
+                stack.extend(t for targets in s.trans.values() for t in targets)
+        assert len(seen) == 2
+
+        lexer = LexerGenerator()
+        lexer.add_token_rule('AS', r'a+')
+        lexer.add_token_rule('B', r'b')
+        lexer.build()
+        tokens = lexer.tokenize('aaab a b')
+        assert [(t.type, t.value) for t in tokens[:-1]] == [
+            ('AS', 'aaa'), ('B', 'b'), ('AS', 'a'), ('B', 'b')
+        ]
+        with pytest.raises(SyntaxError):
+            lexer.tokenize('c')
+
+    def test_char_class_shares_end_state(self):
+        """[Medium] A character class builds one start and one shared end state"""
+        from src.compiler_generator.lexer_generator import RegexParser, thompson
+
+        frag = thompson(RegexParser('[a-c]').parse())
+        assert len(frag.accepts) == 1
+        end = next(iter(frag.accepts))
+        assert frag.start.trans == {'a': {end}, 'b': {end}, 'c': {end}}
+
+        lexer = LexerGenerator()
+        lexer.add_token_rule('ID', r'[a-c](x|[0-9])*')
+        lexer.build()
+        assert [t.value for t in lexer.tokenize('ax1 b c2x')[:-1]] == ['ax1', 'b', 'c2x']
+
+    def test_dfa_is_minimized(self):
+        """[Medium] Equivalent DFA states are merged: [a-z]+ needs only start + one accepting state"""
+        lexer = LexerGenerator()
+        lexer.add_token_rule('ID', r'[a-z]+')
+        lexer.build()
+        assert len(lexer.accept_token) == 2
+        # Two character classes: the letters and everything else
+        assert len(lexer.trans_table) == 2 * 2
+        assert len({lexer.class_of[ord(ch)] for ch in 'abcxyz'}) == 1
+        assert [t.value for t in lexer.tokenize('abc xyz')[:-1]] == ['abc', 'xyz']
+
+    def test_generated_scanner_matches_table(self):
+        """[Medium] The scanner generated for the DFA agrees with the table-driven scan"""
+        from src.compiler_generator.lexer_generator import scan_spans
+
+        lexer = LexerGenerator()
+        lexer.add_token_rule('IF', r'if')
+        lexer.add_token_rule('ID', r'[a-zA-Z_][a-zA-Z0-9_]*')
+        lexer.add_token_rule('NUM', r'[0-9]+')
+        lexer.add_token_rule('EQ', r'==')
+        lexer.add_token_rule('ASSIGN', r'=')
+        lexer.add_token_rule('PLUS', r'\+')
+        lexer.build()
+        assert lexer.scanner is not None
+
+        for code in ('if ifx == 12+i_1 // c\n  x=y', 'x = 1 $', '// only', 'x = 1 // 注释\n  y é'):
+            assert lexer.scanner(code) == scan_spans(
+                code, lexer.trans_table, lexer.class_of, lexer.accept_token, lexer.start_dfa.id)
+
+    def test_generated_lexer_code_matches_library(self):
+        """[Medium] generate_lexer_code emits a DFA lexer that tokenizes like LexerGenerator"""
+        from src.compiler_generator.lexer_generator import generate_lexer_code, create_lexer_from_spec
+
+        code = 'if ab1 == abab // note\n  12 ifx'
+        for rules in ([('IF', r'if'), ('ID', r'[a-z][a-z0-9]*'), ('NUM', r'[0-9]+'), ('EQ', r'==')],
+                      [('AB', r'(ab)+'), ('IF', r'if'), ('ID', r'[a-z][a-z0-9]*'),
+                       ('NUM', r'[0-9]+'), ('EQ', r'==')]):
+            namespace = {}
+            exec(generate_lexer_code(rules), namespace)
+            generated = namespace['GeneratedLexer']().tokenize(code)
+            expected = create_lexer_from_spec(rules).tokenize(code)
+            assert [(t.type, t.value, t.line, t.column) for t in generated] == \
+                   [(t.type, t.value, t.line, t.column) for t in expected]
+
     # ===================== 8. Error Handling =====================
 
     def test_tokenize_unrecognized_character_raises(self):
@@ -1,7 +1,9 @@
 """语法分析器单元测试"""
 
+import io
+
 from src.compiler_generator.lexer_generator import Token, LexerGenerator
-from src.compiler_generator.parser_generator import ParserGenerator, ParseError, ASTNode
+from src.compiler_generator.parser_generator import ParserGenerator, ParseError, ASTNode, generate_parser_code
 
 
 class TestParserGenerator:
@@ -61,6 +63,39 @@ class TestParserGenerator:
         except ParseError:
             pass  # 预期异常
 
+    def test_write_generated_code(self):
+        """测试流式写出的中间代码与 get_generated_code() 一致（含空代码）"""
+        parser = ParserGenerator()
+        out = io.StringIO()
+        parser.write_generated_code(out)
+        assert out.getvalue() == parser.get_generated_code() == ''
+
+        parser.code_buffer.extend(['t1 = a + b', 'x = t1'])
+        out = io.StringIO()
+        parser.write_generated_code(out)
+        assert out.getvalue() == parser.get_generated_code() == 't1 = a + b\nx = t1'
+
+    def test_control_flow_prefers_while(self):
+        """非终结符名同时含 If 与 While 时按 while 翻译（循环标签与回跳）"""
+        parser = ParserGenerator()
+        parser.set_start_symbol('WhileIfStmt')
+        parser.add_production('WhileIfStmt', ["'WHILE'", "'LPAREN'", 'Cond', "'RPAREN'", "'ID'"])
+        parser.add_production('Cond', ["'ID'"])
+
+        tokens = [Token('WHILE', 'while', 1, 1), Token('LPAREN', '(', 1, 7),
+                  Token('ID', 'c', 1, 8), Token('RPAREN', ')', 1, 9),
+                  Token('ID', 'x', 1, 11), Token('EOF', '', 1, 12)]
+        parser.parse(tokens)
+
+        assert parser.code_buffer == ['L2:', 't1 = not c', 'if t1 goto L1', 'goto L2', 'L1:']
+
+    def test_control_kind_prefers_while(self):
+        """非终结符名同时含 If 与 While 时按 while 处理，与生成的解析器一致"""
+        production = ["'WHILE'", "'LPAREN'", 'Cond', "'RPAREN'", 'Stmt']
+        assert ParserGenerator._control_kind('WhileIfStmt', production) == 2
+        assert ParserGenerator._control_kind('IfStmt', production) == 1
+        assert ParserGenerator._control_kind('WhileStmt', production[:4]) == 0
+
     def test_ast_node_creation(self):
         """测试AST节点创建"""
         token = Token('NUM', '123', 1, 1)
@@ -366,6 +401,178 @@ class TestParserGenerator:
             assert "'a'" in error_message
 
 
+    def test_first_follow_sets(self):
+        """测试经典表达式文法的 FIRST/FOLLOW 集合（含可空链）"""
+        parser = ParserGenerator()
+        parser.set_start_symbol('E')
+        parser.add_production('E', ['T', 'E2'])
+        parser.add_production('E2', ["'+'", 'T', 'E2'])
+        parser.add_production('E2', [])
+        parser.add_production('T', ['F', 'T2'])
+        parser.add_production('T2', ["'*'", 'F', 'T2'])
+        parser.add_production('T2', [])
+        parser.add_production('F', ["'('", 'E', "')'"])
+        parser.add_production('F', ["'id'"])
+        parser.build_analysis_sets()
+
+        assert parser.first_sets['E'] == {'(', 'id'}
+        assert parser.first_sets['E2'] == {'+', 'EPSILON'}
+        assert parser.first_sets['T2'] == {'*', 'EPSILON'}
+        assert parser.follow_sets['E'] == {')', 'EOF'}
+        assert parser.follow_sets['E2'] == {')', 'EOF'}
+        assert parser.follow_sets['T'] == {'+', ')', 'EOF'}
+        assert parser.follow_sets['F'] == {'*', '+', ')', 'EOF'}
+
+    def test_sdt_additive_and_multiplicative_tails(self):
+        """测试加减与乘除尾部共用同一翻译动作，运算链按左结合生成代码"""
+        rules = [('NUM', '[0-9]+'), ('PLUS', r'\+'), ('MUL', r'\*')]
+        parser = ParserGenerator(lexer_rules=rules)
+        parser.set_start_symbol('Expr')
+        parser.add_production('Expr', ['Term', 'ExprTail'])
+        parser.add_production('ExprTail', ["'PLUS'", 'Term', 'ExprTail'])
+        parser.add_production('ExprTail', [])
+        parser.add_production('Term', ['Factor', 'TermTail'])
+        parser.add_production('TermTail', ["'MUL'", 'Factor', 'TermTail'])
+        parser.add_production('TermTail', [])
+        parser.add_production('Factor', ["'NUM'"])
+
+        values = ['1', '+', '2', '*', '3', '*', '4']
+        types = ['NUM', 'PLUS', 'NUM', 'MUL', 'NUM', 'MUL', 'NUM']
+        tokens = [Token(t, v, 1, i + 1) for i, (t, v) in enumerate(zip(types, values))]
+        tokens.append(Token('EOF', '', 1, len(values) + 1))
+        ast = parser.parse(tokens)
+
+        assert parser.code_buffer == ['t1 = 2 * 3', 't2 = t1 * 4', 't3 = 1 + t2']
+        assert ast.synthesized_value == 't3'
+
+        # 不保留语法树时，生成的代码不变，已翻译的子树被释放
+        parser.retain_ast = False
+        ast = parser.parse(tokens)
+        assert parser.code_buffer == ['t1 = 2 * 3', 't2 = t1 * 4', 't3 = 1 + t2']
+        assert ast.synthesized_value == 't3'
+        assert len(ast.children) == 0
+
+    def test_parse_long_statement_list(self):
+        """测试右递归的长语句序列不受 Python 递归深度限制"""
+        rules = [('ID', '[a-zA-Z_][a-zA-Z0-9_]*'), ('NUM', '[0-9]+'), ('ASSIGN', '='), ('SEMI', ';')]
+        parser = ParserGenerator(lexer_rules=rules)
+        parser.set_start_symbol('StmtList')
+        parser.add_production('StmtList', ['Stmt', 'StmtList'])
+        parser.add_production('StmtList', [])
+        parser.add_production('Stmt', ["'ID'", "'ASSIGN'", "'NUM'", "'SEMI'"])
+
+        count = 3000
+        tokens = []
+        for i in range(count):
+            tokens += [Token('ID', 'x', i + 1, 1), Token('ASSIGN', '=', i + 1, 3),
+                       Token('NUM', str(i), i + 1, 5), Token('SEMI', ';', i + 1, 6)]
+        tokens.append(Token('EOF', '', count + 1, 1))
+        parser.parse(tokens)
+
+        assert len(parser.code_buffer) == count
+        assert parser.code_buffer[-1] == f'x = {count - 1}'
+
+    def test_translate_long_operator_chain(self):
+        """测试很长的加法链：尾部循环处理，不受 Python 递归深度限制"""
+        rules = [('ID', '[a-zA-Z_][a-zA-Z0-9_]*'), ('NUM', '[0-9]+'), ('ASSIGN', '='),
+                 ('PLUS', r'\+'), ('SEMI', ';')]
+        parser = ParserGenerator(lexer_rules=rules)
+        parser.set_start_symbol('Stmt')
+        parser.add_production('Stmt', ["'ID'", "'ASSIGN'", 'Expr', "'SEMI'"])
+        parser.add_production('Expr', ['Term', 'ExprTail'])
+        parser.add_production('ExprTail', ["'PLUS'", 'Term', 'ExprTail'])
+        parser.add_production('ExprTail', [])
+        parser.add_production('Term', ["'NUM'"])
+
+        count = 3000
+        tokens = [Token('ID', 'x', 1, 1), Token('ASSIGN', '=', 1, 3), Token('NUM', '0', 1, 5)]
+        for i in range(1, count):
+            tokens += [Token('PLUS', '+', 1, 4 * i + 3), Token('NUM', str(i), 1, 4 * i + 5)]
+        tokens += [Token('SEMI', ';', 1, 4 * count + 3), Token('EOF', '', 2, 1)]
+        parser.parse(tokens)
+
+        assert len(parser.code_buffer) == count
+        assert parser.code_buffer[0] == 't1 = 0 + 1'
+        assert parser.code_buffer[-2] == f't{count - 1} = t{count - 2} + {count - 1}'
+        assert parser.code_buffer[-1] == f'x = t{count - 1}'
+
+    def test_generated_parser_long_statement_list(self):
+        """测试生成的语法分析器：长语句序列不受 Python 递归深度限制"""
+        rules = [('ID', '[a-zA-Z_][a-zA-Z0-9_]*'), ('NUM', '[0-9]+'), ('ASSIGN', '='), ('SEMI', ';')]
+        parser = ParserGenerator(lexer_rules=rules)
+        parser.set_start_symbol('StmtList')
+        parser.add_production('StmtList', ['Stmt', 'StmtList'])
+        parser.add_production('StmtList', [])
+        parser.add_production('Stmt', ["'ID'", "'ASSIGN'", "'NUM'", "'SEMI'"])
+        parser.build_analysis_sets()
+
+        namespace = {}
+        exec(generate_parser_code(parser.grammar, parser.start_symbol, parser.first_sets,
+                                  parser.follow_sets, rules), namespace)
+        generated = namespace['GeneratedParser']()
+
+        count = 3000
+        tokens = []
+        for i in range(count):
+            tokens += [Token('ID', 'x', i + 1, 1), Token('ASSIGN', '=', i + 1, 3),
+                       Token('NUM', str(i), i + 1, 5), Token('SEMI', ';', i + 1, 6)]
+        tokens.append(Token('EOF', '', count + 1, 1))
+        generated.parse(tokens)
+
+        assert len(generated.code_buffer) == count
+        assert generated.code_buffer[-1] == f'x = {count - 1}'
+
+    def test_generated_parser_suggests_first_declared(self):
+        """测试生成的语法分析器：多个只差一个字符的候选时建议最先登记到符号表的变量"""
+        rules = [('ID', '[a-zA-Z_][a-zA-Z0-9_]*'), ('SEMI', ';')]
+        parser = ParserGenerator(lexer_rules=rules)
+        parser.set_start_symbol('Stmt')
+        parser.add_production('Stmt', ["'ID'", "'SEMI'"])
+        parser.build_analysis_sets()
+
+        namespace = {}
+        exec(generate_parser_code(parser.grammar, parser.start_symbol, parser.first_sets,
+                                  parser.follow_sets, rules), namespace)
+        generated = namespace['GeneratedParser']()
+
+        generated.symbol_table['abd'] = {'type': 'var'}
+        generated.symbol_table['axc'] = {'type': 'var'}
+        assert generated._find_one_char_variant('abc') == 'abd'
+
+        generated.symbol_table = {'axc': {'type': 'var'}, 'abd': {'type': 'var'}}
+        assert generated._find_one_char_variant('abc') == 'axc'
+        assert generated._find_one_char_variant('xyz') is None
+
+    def test_undefined_variable_suggestion(self):
+        """测试未定义变量的拼写建议，以及新定义变量后建议随之更新"""
+        parser = ParserGenerator()
+        parser.symbol_table['count'] = {'type': 'var'}
+
+        assert not parser.check_variable_defined('cont')
+        assert "'count'" in parser.semantic_errors[-1]
+
+        parser.symbol_table['cent'] = {'type': 'var'}
+        assert not parser.check_variable_defined('cenr')
+        assert "'cent'" in parser.semantic_errors[-1]
+
+        assert not parser.check_variable_defined('xyz')
+        assert '[建议]' not in parser.semantic_errors[-1]
+        assert parser.check_variable_defined('count')
+
+    def test_ast_repr(self):
+        """AST 打印格式不变，且深树不触发递归上限"""
+        tree = ASTNode('S', [ASTNode('ID', token=Token('ID', 'x', 1, 1)),
+                             ASTNode('E', [ASTNode('T', synthesized_value='t1')])])
+        assert repr(tree) == "S\n  ID ('x')\n  E\n    T [val=t1]\n"
+        assert tree.__repr__(1).startswith("  S\n    ID")
+
+        root = node = ASTNode('N')
+        for _ in range(3000):
+            child = ASTNode('N')
+            node.children.append(child)
+            node = child
+        assert repr(root).count('\n') == 3001
+
 if __name__ == '__main__':
     import sys
     # 简单的测试运行器，不依赖pytest